@@ -74,18 +74,19 @@ def run_eda(df: pd.DataFrame) -> None:
 
     # Criar visualizações
     viz = AgricultureVisualizer()
+    df_viz = viz.prepare(df)
     output_dir = Path("outputs/figures")
     output_dir.mkdir(parents=True, exist_ok=True)
 
     # Gerar gráficos principais
     fig = viz.plot_evolucao_culturas(
-        df,
+        df_viz,
         culturas=["Soja (em grão)", "Milho (em grão)", "Arroz (em casca)"],
         metric="rendimento_kg_ha"
     )
     fig.write_html(output_dir / "evolucao_culturas.html")
 
-    fig = viz.plot_correlacao(df)
+    fig = viz.plot_correlacao(df_viz)
     fig.write_html(output_dir / "correlacao.html")
 
     logger.info(f"Visualizações salvas em: {output_dir}")
@@ -12,7 +12,12 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from config.settings import settings, REGIOES
-from src.data.pam_extractor import PAMExtractor, generate_synthetic_pam_data
+from src.data.pam_extractor import (
+    PAMExtractor,
+    generate_synthetic_pam_data,
+    save_pam_parquet,
+    load_pam_parquet
+)
 from src.features.multicollinearity import VIFAnalyzer
 
 
@@ -57,7 +62,7 @@ class DataLoader:
         # Verificar cache
         if self.use_cache and self._cache_file.exists() and not force_reload:
             logger.info(f"Carregando dados do cache: {self._cache_file}")
-            return pd.read_parquet(self._cache_file)
+            return load_pam_parquet(self._cache_file)
 
         # Gerar ou extrair dados
         if use_synthetic:
@@ -84,7 +89,7 @@ class DataLoader:
 
         # Salvar cache
         if self.use_cache:
-            df.to_parquet(self._cache_file, index=False)
+            save_pam_parquet(df, self._cache_file)
             logger.info(f"Dados salvos em cache: {self._cache_file}")
 
         return df
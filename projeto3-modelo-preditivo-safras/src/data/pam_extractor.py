@@ -3,7 +3,11 @@ Extrator de dados da Produção Agrícola Municipal (PAM) do IBGE.
 Utiliza a API SIDRA para obter dados históricos de safras.
 """
 
+import random
+import threading
 import time
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, List, Optional, Union
 from datetime import datetime
 import pandas as pd
@@ -17,6 +21,82 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from config.settings import settings, CODIGOS_CULTURAS, CODIGOS_ESTADOS
 
+# HTTP/2 requer o pacote h2 (pip install httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@lru_cache(maxsize=512)
+def _build_producao_url(
+    base_url: str,
+    agregado: int,
+    anos: str,
+    variaveis: str,
+    nivel: str,
+    localidades: str,
+    classificacao: str
+) -> str:
+    """Monta a URL de consulta SIDRA (função pura, memoizada)."""
+    return (
+        f"{base_url}/{agregado}/periodos/{anos}/"
+        f"variaveis/{variaveis}?"
+        f"localidades={nivel}[{localidades}]&"
+        f"classificacao={classificacao}"
+    )
+
+
+class TokenBucket:
+    """
+    Rate limiter do tipo token bucket, seguro entre threads.
+
+    Tokens são repostos continuamente a `rate` por segundo até `capacity`,
+    permitindo rajadas curtas dentro da cota da API. A espera acontece fora
+    do lock, então threads concorrentes não ficam serializadas.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        """
+        Args:
+            rate: Requisições por segundo (<= 0 desativa o limite)
+            capacity: Tamanho máximo da rajada
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Consome um token, aguardando a reposição se necessário."""
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Esvazia o bucket por `seconds` (ex: após um Retry-After)."""
+        if self.rate <= 0:
+            return
+
+        with self._lock:
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+            self._last = time.monotonic()
+
 
 class PAMExtractor:
     """
@@ -35,16 +115,50 @@ class PAMExtractor:
 
     BASE_URL = "https://servicodados.ibge.gov.br/api/v3/agregados"
 
-    def __init__(self, rate_limit_delay: float = 0.5):
+    # Remove separador de milhar (".") e troca vírgula decimal por ponto
+    _SIDRA_NUMBER_TABLE = str.maketrans({".": None, ",": "."})
+
+    # Limite de categorias da classificação 81 enviadas em uma mesma URL
+    MAX_CATEGORIAS_POR_REQUISICAO = 12
+
+    # Status HTTP que indicam falha transitória e justificam nova tentativa
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        rate_limit_delay: float = 0.5,
+        burst: int = 1,
+        max_retries: int = 3,
+        cache_size: int = 128
+    ):
         """
         Inicializa o extrator.
 
         Args:
-            rate_limit_delay: Delay entre requisições (segundos)
+            rate_limit_delay: Intervalo médio entre requisições (segundos)
+            burst: Número de requisições permitidas em rajada
+            max_retries: Tentativas extras em respostas 429/5xx
+            cache_size: Máximo de extrações mantidas em memória (0 = sem cache)
         """
         self.rate_limit_delay = rate_limit_delay
-        self._client = httpx.Client(timeout=60)
-        self._last_request_time = 0.0
+        self.max_retries = max_retries
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._limiter = TokenBucket(
+            rate=1.0 / rate_limit_delay if rate_limit_delay > 0 else 0.0,
+            capacity=burst
+        )
+        # Conexão persistente: requisições sequenciais reaproveitam a mesma
+        # sessão TCP/TLS (multiplexada via HTTP/2 quando disponível)
+        self._client = httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(60),
+            limits=httpx.Limits(
+                max_keepalive_connections=8,
+                max_connections=16,
+                keepalive_expiry=300
+            )
+        )
 
         logger.info("PAMExtractor inicializado")
 
@@ -58,12 +172,30 @@ class PAMExtractor:
         """Fecha conexão HTTP."""
         self._client.close()
 
+    def clear_cache(self):
+        """Descarta as extrações mantidas em memória."""
+        self._cache.clear()
+
     def _rate_limit(self):
         """Aplica rate limiting entre requisições."""
-        elapsed = time.time() - self._last_request_time
-        if elapsed < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - elapsed)
-        self._last_request_time = time.time()
+        self._limiter.acquire()
+
+    @staticmethod
+    def _retry_delay(response: httpx.Response, attempt: int) -> float:
+        """
+        Calcula a espera antes de uma nova tentativa.
+
+        Usa o header Retry-After quando presente; caso contrário,
+        backoff exponencial com jitter.
+        """
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+
+        return min(30.0, 2 ** attempt) + random.uniform(0, 1)
 
     def _make_request(self, url: str) -> Union[Dict, List]:
         """
@@ -75,16 +207,28 @@ class PAMExtractor:
         Returns:
             Dados JSON da resposta
         """
-        self._rate_limit()
         logger.debug(f"Requisição: {url}")
 
-        try:
-            response = self._client.get(url)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPError as e:
-            logger.error(f"Erro HTTP: {str(e)}")
-            raise
+        for attempt in range(self.max_retries + 1):
+            self._rate_limit()
+
+            try:
+                response = self._client.get(url)
+
+                if response.status_code in self.RETRY_STATUS and attempt < self.max_retries:
+                    delay = self._retry_delay(response, attempt)
+                    logger.warning(
+                        f"HTTP {response.status_code} | nova tentativa em {delay:.1f}s "
+                        f"({attempt + 1}/{self.max_retries})"
+                    )
+                    self._limiter.pause(delay)
+                    continue
+
+                response.raise_for_status()
+                return response.json()
+            except httpx.HTTPError as e:
+                logger.error(f"Erro HTTP: {str(e)}")
+                raise
 
     def _parse_sidra_response(self, data: List[Dict]) -> pd.DataFrame:
         """
@@ -125,11 +269,6 @@ class PAMExtractor:
                     # Extrair valores por ano
                     for ano, valor in serie.get("serie", {}).items():
                         if valor and valor not in ["-", "...", "X"]:
-                            try:
-                                valor_float = float(str(valor).replace(".", "").replace(",", "."))
-                            except ValueError:
-                                continue
-
                             record = {
                                 "variavel_id": variavel_id,
                                 "variavel": variavel_nome,
@@ -138,16 +277,28 @@ class PAMExtractor:
                                 "localidade": loc_nome,
                                 "nivel": loc_nivel,
                                 "ano": int(ano),
-                                "valor": valor_float,
+                                "valor": str(valor),
                                 **cultura_info
                             }
                             records.append(record)
 
-        return pd.DataFrame(records)
+        df = pd.DataFrame(records)
+
+        if df.empty:
+            return df
+
+        # Conversão numérica vetorizada ("1.234,5" -> 1234.5) em uma única
+        # passada; valores não numéricos viram NaN e são descartados em bloco
+        df["valor"] = pd.to_numeric(
+            df["valor"].str.translate(self._SIDRA_NUMBER_TABLE),
+            errors="coerce"
+        ).astype(np.float64)
+
+        return df.dropna(subset=["valor"]).reset_index(drop=True)
 
     def extract_producao_municipal(
         self,
-        cultura_codigo: int,
+        cultura_codigo: Union[int, List[int]],
         anos: str = "all",
         nivel: str = "N6",  # N6 = Município
         localidades: str = "all"
@@ -156,7 +307,8 @@ class PAMExtractor:
         Extrai dados de produção agrícola municipal.
 
         Args:
-            cultura_codigo: Código da cultura no SIDRA
+            cultura_codigo: Código da cultura no SIDRA (ou lista de códigos,
+                consultados em uma única requisição)
             anos: Anos a extrair (ex: "2020|2021|2022" ou "all")
             nivel: Nível geográfico (N1=Brasil, N3=Estado, N6=Município)
             localidades: Códigos das localidades ou "all"
@@ -177,28 +329,66 @@ class PAMExtractor:
         variaveis = "109|216|214|112|215"
 
         # Classificação: produto das lavouras temporárias
+        if isinstance(cultura_codigo, (list, tuple)):
+            cultura_codigo = ",".join(str(c) for c in cultura_codigo)
         classificacao = f"81[{cultura_codigo}]"
 
-        url = (
-            f"{self.BASE_URL}/{agregado}/periodos/{anos}/"
-            f"variaveis/{variaveis}?"
-            f"localidades={nivel}[{localidades}]&"
-            f"classificacao={classificacao}"
+        url = _build_producao_url(
+            self.BASE_URL, agregado, anos, variaveis, nivel, localidades, classificacao
         )
 
+        # Consultas idênticas na mesma sessão (comum em notebooks) reutilizam
+        # o resultado já processado; devolve cópia para proteger o cache
+        if url in self._cache:
+            self._cache.move_to_end(url)
+            logger.debug(f"Cache hit | cultura={cultura_codigo} | nivel={nivel}")
+            return self._cache[url].copy()
+
         logger.info(f"Extraindo dados de produção | cultura={cultura_codigo} | nivel={nivel}")
 
+        df = self._fetch_producao(url)
+
+        if self.cache_size > 0:
+            self._cache[url] = df
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return df.copy()
+
+        return df
+
+    def _fetch_producao(self, url: str) -> pd.DataFrame:
+        """
+        Requisita e pivota uma consulta de produção da SIDRA.
+
+        Args:
+            url: URL completa da consulta
+
+        Returns:
+            DataFrame com variáveis como colunas
+        """
         data = self._make_request(url)
         df = self._parse_sidra_response(data)
 
         if not df.empty:
-            # Pivotar para ter variáveis como colunas
-            df_pivot = df.pivot_table(
-                index=["localidade_id", "localidade", "nivel", "ano", "cultura_id", "cultura"],
-                columns="variavel",
-                values="valor",
-                aggfunc="first"
-            ).reset_index()
+            # Chaves repetidas como category reduzem a memória do formato longo
+            for col in ["localidade", "nivel", "cultura"]:
+                if col in df.columns:
+                    df[col] = df[col].astype("category")
+
+            # Pivotar ano a ano para manter o pico de memória limitado
+            # em extrações nacionais (o formato longo é muito maior que o pivotado)
+            chunks = [
+                df_ano.pivot_table(
+                    index=["localidade_id", "localidade", "nivel", "ano", "cultura_id", "cultura"],
+                    columns="variavel",
+                    values="valor",
+                    aggfunc="first",
+                    observed=True
+                )
+                for _, df_ano in df.groupby("ano", sort=True)
+            ]
+            del df
+            df_pivot = pd.concat(chunks).reset_index()
 
             # Renomear colunas
             col_map = {
@@ -260,23 +450,50 @@ class PAMExtractor:
         """
         dfs = []
 
-        for codigo in codigos_culturas:
-            logger.info(f"Extraindo cultura {codigo}...")
+        # Várias culturas por requisição (classificacao=81[c1,c2,...]): a SIDRA
+        # devolve um resultado por categoria, já identificado por cultura_id
+        batches = [
+            codigos_culturas[i:i + self.MAX_CATEGORIAS_POR_REQUISICAO]
+            for i in range(0, len(codigos_culturas), self.MAX_CATEGORIAS_POR_REQUISICAO)
+        ]
+
+        for batch in batches:
+            logger.info(f"Extraindo culturas {batch}...")
             try:
                 df = self.extract_producao_municipal(
-                    cultura_codigo=codigo,
+                    cultura_codigo=batch,
                     anos=anos,
                     nivel=nivel
                 )
                 if not df.empty:
                     dfs.append(df)
-            except Exception as e:
-                logger.warning(f"Erro ao extrair cultura {codigo}: {str(e)}")
                 continue
+            except Exception as e:
+                if len(batch) == 1:
+                    logger.warning(f"Erro ao extrair cultura {batch[0]}: {str(e)}")
+                    continue
+                logger.warning(
+                    f"Erro ao extrair lote {batch}: {str(e)} | tentando culturas individualmente"
+                )
+
+            # Fallback: uma requisição por cultura para isolar a que falhou
+            for codigo in batch:
+                try:
+                    df = self.extract_producao_municipal(
+                        cultura_codigo=codigo,
+                        anos=anos,
+                        nivel=nivel
+                    )
+                    if not df.empty:
+                        dfs.append(df)
+                except Exception as e:
+                    logger.warning(f"Erro ao extrair cultura {codigo}: {str(e)}")
+                    continue
 
         if dfs:
             df_final = pd.concat(dfs, ignore_index=True)
-            logger.info(f"Total extraído: {len(df_final)} registros de {len(dfs)} culturas")
+            n_culturas = df_final["cultura_id"].nunique() if "cultura_id" in df_final.columns else len(dfs)
+            logger.info(f"Total extraído: {len(df_final)} registros de {n_culturas} culturas")
             return df_final
 
         return pd.DataFrame()
@@ -408,6 +625,56 @@ def generate_synthetic_pam_data(
     return df
 
 
+# Colunas de baixa cardinalidade gravadas com dictionary encoding no Parquet
+PARQUET_DICTIONARY_COLUMNS = ["estado", "cultura", "localidade_id", "localidade", "regiao"]
+
+
+def save_pam_parquet(df: pd.DataFrame, path: Union[str, Path]) -> Path:
+    """
+    Persiste dados da PAM em Parquet (Arrow) com compressão zstd.
+
+    Colunas categóricas são gravadas com dictionary encoding, de modo que o
+    dtype category sobrevive ao round-trip sem re-hash na leitura.
+
+    Args:
+        df: DataFrame com dados da PAM
+        path: Caminho do arquivo .parquet
+
+    Returns:
+        Caminho do arquivo salvo
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    dictionary_cols = [c for c in PARQUET_DICTIONARY_COLUMNS if c in df.columns]
+    pq.write_table(table, path, compression="zstd", use_dictionary=dictionary_cols or True)
+
+    logger.debug(f"PAM salva em Parquet: {path} ({len(df)} registros)")
+
+    return path
+
+
+def load_pam_parquet(
+    path: Union[str, Path],
+    columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Carrega dados da PAM salvos com save_pam_parquet.
+
+    Args:
+        path: Caminho do arquivo .parquet
+        columns: Colunas a carregar (None = todas)
+
+    Returns:
+        DataFrame com dtypes originais (incluindo category)
+    """
+    import pyarrow.parquet as pq
+
+    return pq.read_table(path, columns=columns).to_pandas()
+
+
 # Exemplo de uso
 if __name__ == "__main__":
     from loguru import logger
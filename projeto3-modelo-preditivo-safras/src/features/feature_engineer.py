@@ -2,6 +2,8 @@
 Engenharia de Features para Modelo de Predição de Safras.
 """
 
+import hashlib
+from collections import OrderedDict
 from typing import List, Optional, Tuple
 import pandas as pd
 import numpy as np
@@ -13,6 +15,213 @@ from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
 from loguru import logger
 
+# Numba é opcional: sem ele, handle_outliers usa o caminho em pandas
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Polars é opcional: usado apenas por FeatureEngineer.fit_transform_polars
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _zscore_bounds(arr: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calcula média ± threshold * desvio padrão de cada coluna de `arr`.
+
+        Média e variância saem de uma única passada (Welford), ignorando NaN
+        como o pandas (ddof=1). Colunas com menos de 2 valores recebem limites
+        NaN, que não clipam nada.
+
+        Returns:
+            Tuple (limites inferiores, limites superiores) por coluna
+        """
+        n_rows, n_cols = arr.shape
+        lower = np.full(n_cols, np.nan)
+        upper = np.full(n_cols, np.nan)
+
+        for j in prange(n_cols):
+            n = 0
+            mean = 0.0
+            m2 = 0.0
+            for i in range(n_rows):
+                v = arr[i, j]
+                if not np.isnan(v):
+                    n += 1
+                    delta = v - mean
+                    mean += delta / n
+                    m2 += delta * (v - mean)
+
+            if n < 2:
+                continue
+
+            std = np.sqrt(m2 / (n - 1))
+            lower[j] = mean - threshold * std
+            upper[j] = mean + threshold * std
+
+        return lower, upper
+
+    @njit(parallel=True, cache=True)
+    def _apply_bounds(arr: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+        """
+        Clipa in-place cada coluna de `arr` nos limites dados, em paralelo.
+
+        Returns:
+            Número de valores clipados por coluna
+        """
+        n_rows, n_cols = arr.shape
+        counts = np.zeros(n_cols, dtype=np.int64)
+
+        for j in prange(n_cols):
+            lo = lower[j]
+            hi = upper[j]
+            for i in range(n_rows):
+                v = arr[i, j]
+                if v < lo:
+                    arr[i, j] = lo
+                    counts[j] += 1
+                elif v > hi:
+                    arr[i, j] = hi
+                    counts[j] += 1
+
+        return counts
+
+    @njit(parallel=True, cache=True)
+    def _impute_standardize_stats(arr: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calcula mediana, média e desvio padrão de cada coluna após imputação.
+
+        A média e o desvio (ddof=0, como o StandardScaler) da coluna imputada
+        saem dos valores válidos mais as cópias da mediana, sem materializá-la.
+        Colunas totalmente NaN recebem mediana e média 0 e escala 1.
+
+        Returns:
+            Tuple (medianas, médias, escalas) por coluna
+        """
+        n_rows, n_cols = arr.shape
+        medians = np.zeros(n_cols)
+        means = np.zeros(n_cols)
+        scales = np.ones(n_cols)
+
+        for j in prange(n_cols):
+            col = arr[:, j]
+            valid = col[~np.isnan(col)]
+            if valid.size == 0:
+                continue
+
+            median = np.median(valid)
+            n_missing = n_rows - valid.size
+            mean = (valid.sum() + n_missing * median) / n_rows
+            sq = ((valid - mean) ** 2).sum() + n_missing * (median - mean) ** 2
+            std = np.sqrt(sq / n_rows)
+
+            medians[j] = median
+            means[j] = mean
+            if std > 0:
+                scales[j] = std
+
+        return medians, means, scales
+
+    @njit(parallel=True, cache=True)
+    def _impute_standardize(
+        arr: np.ndarray,
+        medians: np.ndarray,
+        means: np.ndarray,
+        scales: np.ndarray
+    ) -> np.ndarray:
+        """
+        Imputa NaN pela mediana e padroniza cada coluna numa única passada.
+
+        Returns:
+            Nova matriz float64 imputada e padronizada
+        """
+        n_rows, n_cols = arr.shape
+        out = np.empty((n_rows, n_cols))
+
+        for j in prange(n_cols):
+            for i in range(n_rows):
+                v = arr[i, j]
+                if np.isnan(v):
+                    v = medians[j]
+                out[i, j] = (v - means[j]) / scales[j]
+
+        return out
+
+
+def _write_clipped(df: pd.DataFrame, cols: List[str], arr: np.ndarray) -> None:
+    """
+    Grava em `df[cols]` o array clipado, preservando os dtypes inteiros.
+
+    Como o Series.clip, uma coluna inteira só vira float quando algum valor
+    foi clipado para um limite fracionário.
+
+    Args:
+        df: DataFrame alterado in-place
+        cols: Colunas correspondentes às colunas de `arr`
+        arr: Valores clipados (n_linhas x len(cols))
+    """
+    dtypes = df[cols].dtypes.tolist()
+    df[cols] = arr
+
+    for j, (col, dtype) in enumerate(zip(cols, dtypes)):
+        if pd.api.types.is_integer_dtype(dtype):
+            # NaN só aparece em inteiros anuláveis (Int64), que o astype preserva
+            values = arr[:, j]
+            values = values[~np.isnan(values)]
+            if np.array_equal(values, np.trunc(values)):
+                df[col] = df[col].astype(dtype)
+
+
+def _frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Gera um hash do conteúdo do DataFrame (valores, índice, colunas e dtypes).
+
+    Args:
+        df: DataFrame a identificar
+
+    Returns:
+        Digest hexadecimal que muda com qualquer alteração nos dados
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update(repr(list(zip(df.columns, df.dtypes.astype(str)))).encode())
+    return digest.hexdigest()
+
+
+def _combine_codes(factorized: List[Tuple[np.ndarray, pd.Index]]) -> np.ndarray:
+    """
+    Combina chaves já fatoradas (pd.factorize) em um único código inteiro.
+
+    Permite agrupar por várias colunas com um groupby sobre um único array
+    int64, sem re-hashear as strings originais a cada chamada.
+
+    Args:
+        factorized: Lista de (códigos, valores únicos) de cada coluna-chave
+
+    Returns:
+        Códigos int64 por linha (Int64 com <NA> onde alguma chave é nula,
+        para que o groupby descarte essas linhas como faria com NaN)
+    """
+    n_rows = len(factorized[0][0])
+    codes = np.zeros(n_rows, dtype=np.int64)
+    missing = np.zeros(n_rows, dtype=bool)
+
+    for col_codes, uniques in factorized:
+        codes = codes * max(len(uniques), 1) + col_codes
+        missing |= col_codes < 0
+
+    if missing.any():
+        return pd.arrays.IntegerArray(codes, missing)
+
+    return codes
+
 
 class FeatureEngineer:
     """
@@ -29,7 +238,8 @@ class FeatureEngineer:
         self,
         numeric_features: Optional[List[str]] = None,
         categorical_features: Optional[List[str]] = None,
-        target: str = "rendimento_kg_ha"
+        target: str = "rendimento_kg_ha",
+        cache_size: int = 4
     ):
         """
         Inicializa o engenheiro de features.
@@ -38,10 +248,13 @@ class FeatureEngineer:
             numeric_features: Lista de features numéricas
             categorical_features: Lista de features categóricas
             target: Nome da variável alvo
+            cache_size: Máximo de resultados de fit_transform mantidos em memória (0 = sem cache)
         """
         self.numeric_features = numeric_features or []
         self.categorical_features = categorical_features or []
         self.target = target
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[pd.DataFrame, pd.Series]]" = OrderedDict()
 
         self._scalers = {}
         self._encoders = {}
@@ -52,7 +265,11 @@ class FeatureEngineer:
         df: pd.DataFrame,
         group_cols: List[str] = ["estado", "cultura"],
         value_col: str = "rendimento_kg_ha",
-        lags: List[int] = [1, 2, 3]
+        lags: List[int] = [1, 2, 3],
+        assume_sorted: bool = False,
+        copy: bool = True,
+        group_codes: Optional[np.ndarray] = None,
+        interactions: bool = False
     ) -> pd.DataFrame:
         """
         Cria features temporais usando APENAS valores passados (sem data leakage).
@@ -65,26 +282,52 @@ class FeatureEngineer:
             group_cols: Colunas para agrupar
             value_col: Coluna de valor
             lags: Lista de lags a criar
+            assume_sorted: Se True, `df` já está ordenado por group_cols + ["ano"]
+                e a reordenação é pulada
+            copy: Com assume_sorted=True, se False adiciona as colunas
+                diretamente em `df`
+            group_codes: Códigos inteiros pré-calculados de group_cols, alinhados
+                às linhas de `df` (exige assume_sorted=True)
+            interactions: Se True, também cria area_x_rend_lag (mesma feature de
+                create_interaction_features) reaproveitando o lag1 já extraído
 
         Returns:
             DataFrame com features temporais (apenas lags)
         """
-        df = df.copy()
-        df = df.sort_values(group_cols + ["ano"])
-
-        # Lag features - SEGURO: usa apenas valores passados
-        for lag in lags:
-            col_name = f"{value_col}_lag{lag}"
-            df[col_name] = df.groupby(group_cols)[value_col].shift(lag)
+        if group_codes is not None and not assume_sorted:
+            raise ValueError("group_codes exige assume_sorted=True (códigos alinhados às linhas)")
+
+        if not assume_sorted:
+            # sort_values já devolve um novo DataFrame: não é preciso copiar antes
+            df = df.sort_values(group_cols + ["ano"])
+        elif copy:
+            df = df.copy()
+
+        # Lag features - SEGURO: usa apenas valores passados.
+        # Os dados já estão ordenados, então as chaves do groupby não precisam de sort.
+        # shift com lista calcula todos os lags num único groupby
+        if lags:
+            keys = group_cols if group_codes is None else group_codes
+            lagged = df.groupby(keys, sort=False, observed=True)[value_col].shift(list(lags))
+            df[[f"{value_col}_lag{lag}" for lag in lags]] = lagged.to_numpy()
 
         # Taxa de crescimento baseada em LAG (ano anterior vs 2 anos atrás)
         # SEGURO: não usa valor atual
         lag1_col = f"{value_col}_lag1"
         lag2_col = f"{value_col}_lag2"
-        if lag1_col in df.columns and lag2_col in df.columns:
-            df[f"{value_col}_growth_rate"] = (
-                (df[lag1_col] - df[lag2_col]) / df[lag2_col].replace(0, np.nan)
-            )
+        lag1 = None
+        if lag1_col in df.columns:
+            lag1 = df[lag1_col].to_numpy(dtype=np.float64, na_value=np.nan)
+        if lag1 is not None and lag2_col in df.columns:
+            lag2 = df[lag2_col].to_numpy(dtype=np.float64, na_value=np.nan)
+            # Divisão só onde lag2 != 0; o restante permanece NaN
+            growth = np.full(len(df), np.nan)
+            np.divide(lag1 - lag2, lag2, out=growth, where=lag2 != 0)
+            df[f"{value_col}_growth_rate"] = growth
+
+        # Interação área x rendimento histórico, calculada enquanto lag1 está em mãos
+        if interactions and lag1 is not None and "area_plantada_ha" in df.columns:
+            df["area_x_rend_lag"] = df["area_plantada_ha"].to_numpy(dtype=np.float64, na_value=np.nan) * lag1
 
         # DATA LEAKAGE REMOVIDO:
         # - ma3, std3: rolling window inclui valor atual
@@ -96,17 +339,19 @@ class FeatureEngineer:
 
         return df
 
-    def create_interaction_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def create_interaction_features(self, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
         """
         Cria features de interação.
 
         Args:
             df: DataFrame
+            copy: Se False, adiciona as colunas diretamente em `df`
 
         Returns:
             DataFrame com features de interação
         """
-        df = df.copy()
+        if copy:
+            df = df.copy()
 
         # Interação área x rendimento histórico
         if "area_plantada_ha" in df.columns and "rendimento_kg_ha_lag1" in df.columns:
@@ -131,7 +376,9 @@ class FeatureEngineer:
     def create_aggregated_features(
         self,
         df: pd.DataFrame,
-        group_col: str = "estado"
+        group_col: str = "estado",
+        copy: bool = True,
+        group_codes: Optional[np.ndarray] = None
     ) -> pd.DataFrame:
         """
         Cria features agregadas por grupo usando apenas dados passados.
@@ -142,15 +389,30 @@ class FeatureEngineer:
         Args:
             df: DataFrame
             group_col: Coluna para agrupar
+            copy: Se False, adiciona as colunas diretamente em `df`
+            group_codes: Códigos inteiros pré-calculados de [group_col, "ano"],
+                alinhados às linhas de `df`
 
         Returns:
             DataFrame com features agregadas (sem data leakage)
         """
-        df = df.copy()
+        if copy:
+            df = df.copy()
 
         # Agregações de area_plantada_ha - SEGURO: não é o target
         if "area_plantada_ha" in df.columns:
-            group_mean = df.groupby([group_col, "ano"])["area_plantada_ha"].transform("mean")
+            if isinstance(group_codes, np.ndarray):
+                # Códigos inteiros sem nulos: média por grupo com bincount e
+                # broadcast por indexação, sem montar um GroupBy
+                area = df["area_plantada_ha"].to_numpy(dtype=np.float64, na_value=np.nan)
+                valid = ~np.isnan(area)
+                sums = np.bincount(group_codes, weights=np.where(valid, area, 0.0))
+                counts = np.bincount(group_codes, weights=valid)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    group_mean = (sums / counts)[group_codes]
+            else:
+                keys = [group_col, "ano"] if group_codes is None else group_codes
+                group_mean = df.groupby(keys, sort=False, observed=True)["area_plantada_ha"].transform("mean")
             df[f"area_plantada_ha_{group_col}_mean"] = group_mean
             df[f"area_plantada_ha_{group_col}_dev"] = df["area_plantada_ha"] - group_mean
 
@@ -168,7 +430,9 @@ class FeatureEngineer:
         df: pd.DataFrame,
         columns: Optional[List[str]] = None,
         method: str = "clip",
-        threshold: float = 3.0
+        threshold: float = 3.0,
+        copy: bool = True,
+        dtype: type = np.float64
     ) -> pd.DataFrame:
         """
         Trata outliers nas features numéricas.
@@ -178,17 +442,33 @@ class FeatureEngineer:
             columns: Colunas a tratar (None = todas numéricas)
             method: 'clip' (limitar) ou 'remove' (remover linhas)
             threshold: Número de desvios padrão para considerar outlier
+            copy: Se False, clipa as colunas diretamente em `df`
+            dtype: Tipo do array de trabalho no caminho Numba; np.float32 reduz
+                pela metade o tráfego de memória e grava as colunas em float32
 
         Returns:
             DataFrame com outliers tratados
         """
-        df = df.copy()
+        if copy:
+            df = df.copy()
 
         if columns is None:
             columns = df.select_dtypes(include=[np.number]).columns.tolist()
 
         outliers_count = 0
 
+        # Caminho rápido: kernel Numba calcula estatísticas e clipa todas as colunas
+        if method == "clip" and NUMBA_AVAILABLE:
+            cols = [c for c in columns if c in df.columns]
+            if cols:
+                arr = np.asfortranarray(df[cols].to_numpy(dtype=dtype, na_value=np.nan))
+                lower, upper = _zscore_bounds(arr, float(threshold))
+                outliers_count = int(_apply_bounds(arr, lower, upper).sum())
+                _write_clipped(df, cols, arr)
+
+            logger.info(f"Outliers tratados: {outliers_count} valores ({method})")
+            return df
+
         for col in columns:
             if col in df.columns:
                 mean = df[col].mean()
@@ -234,25 +514,30 @@ class FeatureEngineer:
         }
         selected_scaler = scalers.get(scaler, StandardScaler())
 
-        # Pipeline numérico
-        numeric_pipeline = Pipeline([
-            ("imputer", SimpleImputer(strategy="median")),
-            ("scaler", selected_scaler)
-        ])
-
-        # Pipeline categórico
+        # Pipeline numérico: imputação pela mediana + padronização numa única
+        # passada por coluna; os demais scalers mantêm as duas etapas
+        if scaler in ("minmax", "robust"):
+            numeric_pipeline = Pipeline([
+                ("imputer", SimpleImputer(strategy="median")),
+                ("scaler", selected_scaler)
+            ])
+        else:
+            numeric_pipeline = FusedNumericTransformer()
+
+        # Pipeline categórico: one-hot esparso (a maioria das entradas é zero)
         categorical_pipeline = Pipeline([
             ("imputer", SimpleImputer(strategy="constant", fill_value="missing")),
-            ("encoder", OneHotEncoder(handle_unknown="ignore", sparse_output=False))
+            ("encoder", OneHotEncoder(handle_unknown="ignore", sparse_output=True))
         ])
 
-        # Combinar pipelines
+        # Combinar pipelines (saída esparsa quando a densidade fica abaixo de 30%)
         preprocessor = ColumnTransformer(
             transformers=[
                 ("num", numeric_pipeline, numeric_features),
                 ("cat", categorical_pipeline, categorical_features)
             ],
-            remainder="drop"
+            remainder="drop",
+            sparse_threshold=0.3
         )
 
         logger.info(
@@ -279,12 +564,219 @@ class FeatureEngineer:
         """
         target_col = target_col or self.target
 
-        # Aplicar transformações
-        df_transformed = self.create_temporal_features(df)
-        df_transformed = self.create_interaction_features(df_transformed)
-        df_transformed = self.create_aggregated_features(df_transformed)
-        df_transformed = self.handle_outliers(df_transformed)
+        # Chamadas repetidas com os mesmos dados (CV, busca de hiperparâmetros)
+        # reutilizam o resultado; devolve cópias para proteger o cache
+        key = (_frame_fingerprint(df), target_col) if self.cache_size > 0 else None
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            logger.debug("Cache hit em fit_transform")
+            X, y = self._cache[key]
+            return X.copy(), y.copy()
+
+        # Fatorar as chaves uma vez (códigos na ordem dos valores): a ordenação e
+        # os groupbys seguintes trabalham sobre inteiros em vez de strings
+        keys = [pd.factorize(df[col], sort=True) for col in ("estado", "cultura", "ano")]
+
+        # Ordenar uma única vez por uma chave int64 composta, com sort estável
+        # como sort_values; nulos (código -1) vão para o fim (na_position="last").
+        # O novo DataFrame pertence a este método, então as etapas seguintes o
+        # alteram diretamente, sem reordenar nem copiar
+        sort_key = np.zeros(len(df), dtype=np.int64)
+        for codes, uniques in keys:
+            sort_key = sort_key * (len(uniques) + 1) + np.where(codes < 0, len(uniques), codes)
+        order = np.argsort(sort_key, kind="stable")
+        df_transformed = df.take(order)
+
+        estado, cultura, ano = [(codes[order], uniques) for codes, uniques in keys]
+
+        # A interação é criada junto com os lags (equivale a create_interaction_features)
+        df_transformed = self.create_temporal_features(
+            df_transformed, assume_sorted=True, copy=False,
+            group_codes=_combine_codes([estado, cultura]), interactions=True
+        )
+        df_transformed = self.create_aggregated_features(
+            df_transformed, copy=False, group_codes=_combine_codes([estado, ano])
+        )
+        df_transformed = self.handle_outliers(df_transformed, copy=False)
+
+        X, y = self._split_features_target(df_transformed, target_col)
+
+        if key is not None:
+            self._cache[key] = (X, y)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return X.copy(), y.copy()
+
+        return X, y
+
+    def clear_cache(self):
+        """Descarta os resultados de fit_transform mantidos em memória."""
+        self._cache.clear()
+
+    def fit_transform_polars(
+        self,
+        df: pd.DataFrame,
+        target_col: Optional[str] = None,
+        group_cols: List[str] = ["estado", "cultura"],
+        value_col: str = "rendimento_kg_ha",
+        lags: List[int] = [1, 2, 3],
+        group_col: str = "estado",
+        threshold: float = 3.0
+    ) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Equivalente a fit_transform executado como um único plano lazy do Polars.
+
+        Lags, interação, agregados e clipping de outliers são expressos como
+        expressões sobre a mesma LazyFrame, permitindo que o Polars funda as
+        etapas e paralelize as janelas por grupo. A conversão para pandas
+        acontece apenas na saída, antes do sklearn.
+
+        Args:
+            df: DataFrame original
+            target_col: Coluna alvo (usa self.target se None)
+            group_cols: Colunas que definem a série temporal
+            value_col: Coluna para lags
+            lags: Lista de lags a criar
+            group_col: Coluna para features agregadas
+            threshold: Número de desvios padrão para clipping
+
+        Returns:
+            Tuple (X, y) com features e target
+        """
+        if not POLARS_AVAILABLE:
+            raise ImportError("Polars não disponível. Instale com: pip install polars")
+
+        target_col = target_col or self.target
+
+        lf = self._polars_feature_plan(
+            df, group_cols, value_col, lags, group_col, interactions=True
+        )
+
+        # Clipping de outliers em todas as colunas numéricas (média ± threshold * std)
+        numeric_cols = [name for name, dtype in lf.collect_schema().items() if dtype.is_numeric()]
+        clipped = []
+        for c in numeric_cols:
+            col = pl.col(c).cast(pl.Float64)
+            clipped.append(col.clip(
+                col.mean() - threshold * col.std(),
+                col.mean() + threshold * col.std()
+            ))
+        lf = lf.with_columns(clipped)
+
+        df_transformed = lf.collect().to_pandas()
+
+        logger.info(f"Features criadas via Polars | colunas: {len(df_transformed.columns)}")
+
+        return self._split_features_target(df_transformed, target_col)
+
+    def create_temporal_aggregated_features_polars(
+        self,
+        df: pd.DataFrame,
+        group_cols: List[str] = ["estado", "cultura"],
+        value_col: str = "rendimento_kg_ha",
+        lags: List[int] = [1, 2, 3],
+        group_col: str = "estado"
+    ) -> pd.DataFrame:
+        """
+        Equivalente a create_temporal_features + create_aggregated_features em Polars.
+
+        Ordenação, lags, taxa de crescimento e agregados por grupo/ano são
+        produzidos por um único plano lazy, coletado uma só vez.
+
+        Args:
+            df: DataFrame original
+            group_cols: Colunas que definem a série temporal
+            value_col: Coluna para lags
+            lags: Lista de lags a criar
+            group_col: Coluna para features agregadas
+
+        Returns:
+            DataFrame ordenado com features temporais e agregadas
+        """
+        if not POLARS_AVAILABLE:
+            raise ImportError("Polars não disponível. Instale com: pip install polars")
 
+        lf = self._polars_feature_plan(
+            df, group_cols, value_col, lags, group_col, interactions=False
+        )
+        df_features = lf.collect().to_pandas()
+
+        logger.info(f"Features temporais e agregadas criadas via Polars para '{value_col}'")
+
+        return df_features
+
+    @staticmethod
+    def _polars_feature_plan(
+        df: pd.DataFrame,
+        group_cols: List[str],
+        value_col: str,
+        lags: List[int],
+        group_col: str,
+        interactions: bool = True
+    ) -> "pl.LazyFrame":
+        """
+        Monta o plano lazy com lags, taxa de crescimento, interação e agregados.
+
+        Args:
+            df: DataFrame original
+            group_cols: Colunas que definem a série temporal
+            value_col: Coluna para lags
+            lags: Lista de lags a criar
+            group_col: Coluna para features agregadas
+            interactions: Se True, inclui a feature de interação area_x_rend_lag
+
+        Returns:
+            LazyFrame ainda não coletada
+        """
+        lf = pl.from_pandas(df).lazy().sort(group_cols + ["ano"], maintain_order=True)
+
+        # Lags (apenas valores passados, sem data leakage)
+        lf = lf.with_columns([
+            pl.col(value_col).shift(lag).over(group_cols).alias(f"{value_col}_lag{lag}")
+            for lag in lags
+        ])
+
+        lag1_col = f"{value_col}_lag1"
+        lag2_col = f"{value_col}_lag2"
+        schema = lf.collect_schema()
+
+        derived = []
+        if lag1_col in schema and lag2_col in schema:
+            derived.append(
+                pl.when(pl.col(lag2_col) != 0)
+                .then((pl.col(lag1_col) - pl.col(lag2_col)) / pl.col(lag2_col))
+                .alias(f"{value_col}_growth_rate")
+            )
+        if interactions and "area_plantada_ha" in schema and lag1_col in schema:
+            derived.append(
+                (pl.col("area_plantada_ha") * pl.col(lag1_col)).alias("area_x_rend_lag")
+            )
+        if "area_plantada_ha" in schema:
+            group_mean = pl.col("area_plantada_ha").mean().over([group_col, "ano"])
+            derived.append(group_mean.alias(f"area_plantada_ha_{group_col}_mean"))
+            derived.append(
+                (pl.col("area_plantada_ha") - group_mean).alias(f"area_plantada_ha_{group_col}_dev")
+            )
+        if derived:
+            lf = lf.with_columns(derived)
+
+        return lf
+
+    def _split_features_target(
+        self,
+        df_transformed: pd.DataFrame,
+        target_col: str
+    ) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Separa X e y e remove colunas sem valor preditivo.
+
+        Args:
+            df_transformed: DataFrame já transformado
+            target_col: Coluna alvo
+
+        Returns:
+            Tuple (X, y) com features e target
+        """
         # Separar X e y
         y = df_transformed[target_col].copy()
         X = df_transformed.drop(columns=[target_col])
@@ -318,39 +810,94 @@ class TemporalFeatureTransformer(BaseEstimator, TransformerMixin):
     def transform(self, X):
         X = X.copy()
 
-        for lag in self.lags:
-            col_name = f"{self.value_col}_lag{lag}"
-            if all(c in X.columns for c in self.group_cols):
-                X[col_name] = X.groupby(self.group_cols)[self.value_col].shift(lag)
+        if self.lags and all(c in X.columns for c in self.group_cols):
+            lagged = X.groupby(self.group_cols, sort=False, observed=True)[self.value_col].shift(list(self.lags))
+            X[[f"{self.value_col}_lag{lag}" for lag in self.lags]] = lagged.to_numpy()
 
         return X
 
 
+class FusedNumericTransformer(BaseEstimator, TransformerMixin):
+    """Imputação pela mediana + StandardScaler numa única passada por coluna."""
+
+    def fit(self, X, y=None):
+        arr = np.asfortranarray(np.asarray(X, dtype=np.float64))
+
+        if NUMBA_AVAILABLE:
+            self.medians_, self.means_, self.scales_ = _impute_standardize_stats(arr)
+        else:
+            medians = np.nan_to_num(np.nanmedian(arr, axis=0))
+            imputed = np.where(np.isnan(arr), medians, arr)
+            stds = imputed.std(axis=0)
+            self.medians_ = medians
+            self.means_ = imputed.mean(axis=0)
+            self.scales_ = np.where(stds > 0, stds, 1.0)
+
+        self.n_features_in_ = arr.shape[1]
+        if hasattr(X, "columns"):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+
+        return self
+
+    def transform(self, X):
+        arr = np.asfortranarray(np.asarray(X, dtype=np.float64))
+
+        if NUMBA_AVAILABLE:
+            return _impute_standardize(arr, self.medians_, self.means_, self.scales_)
+
+        imputed = np.where(np.isnan(arr), self.medians_, arr)
+        return (imputed - self.means_) / self.scales_
+
+    def get_feature_names_out(self, input_features=None):
+        if input_features is None:
+            input_features = getattr(
+                self, "feature_names_in_",
+                [f"x{i}" for i in range(self.n_features_in_)]
+            )
+        return np.asarray(input_features, dtype=object)
+
+
 class OutlierClipTransformer(BaseEstimator, TransformerMixin):
     """Transformador para clipar outliers."""
 
     def __init__(self, threshold: float = 3.0):
         self.threshold = threshold
-        self._bounds = {}
+        self._cols = []
+        self._lower = np.empty(0)
+        self._upper = np.empty(0)
 
     def fit(self, X, y=None):
         X_numeric = X.select_dtypes(include=[np.number])
+        self._cols = list(X_numeric.columns)
 
-        for col in X_numeric.columns:
-            mean = X_numeric[col].mean()
-            std = X_numeric[col].std()
-            self._bounds[col] = (
-                mean - self.threshold * std,
-                mean + self.threshold * std
-            )
+        if NUMBA_AVAILABLE:
+            arr = np.asfortranarray(X_numeric.to_numpy(dtype=np.float64, na_value=np.nan))
+            lower, upper = _zscore_bounds(arr, float(self.threshold))
+        else:
+            stats = X_numeric.agg(["mean", "std"]).to_numpy(dtype=np.float64)
+            lower = stats[0] - self.threshold * stats[1]
+            upper = stats[0] + self.threshold * stats[1]
+
+        # Limites NaN (coluna com menos de 2 valores) não clipam nada
+        self._lower = np.where(np.isnan(lower), -np.inf, lower)
+        self._upper = np.where(np.isnan(upper), np.inf, upper)
 
         return self
 
     def transform(self, X):
         X = X.copy()
 
-        for col, (lower, upper) in self._bounds.items():
-            if col in X.columns:
-                X[col] = X[col].clip(lower=lower, upper=upper)
+        present = np.array([col in X.columns for col in self._cols], dtype=bool)
+        cols = [col for col, ok in zip(self._cols, present) if ok]
+        if not cols:
+            return X
+
+        # Todas as colunas clipadas de uma vez, com limites por coluna
+        arr = np.asfortranarray(X[cols].to_numpy(dtype=np.float64, na_value=np.nan))
+        if NUMBA_AVAILABLE:
+            _apply_bounds(arr, self._lower[present], self._upper[present])
+        else:
+            np.clip(arr, self._lower[present], self._upper[present], out=arr)
+        _write_clipped(X, cols, arr)
 
         return X
@@ -15,9 +15,144 @@ Interpretação do VIF:
 from typing import List, Optional, Tuple, Dict
 import pandas as pd
 import numpy as np
-from statsmodels.stats.outliers_influence import variance_inflation_factor
+from joblib import Parallel, delayed
+from scipy.linalg import cho_factor, cho_solve, qr, LinAlgError
 from loguru import logger
 
+# Abaixo disso, o custo de despachar tarefas supera o ganho do paralelismo
+PARALLEL_MIN_FEATURES = 32
+
+
+def _correlation_inverse(X: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Calcula a inversa da matriz de correlação das colunas de X.
+
+    Para features padronizadas, VIF_i = [R⁻¹]_ii, onde R é a matriz de
+    correlação. Uma única fatoração de Cholesky (p x p) substitui as p
+    regressões OLS do cálculo feature a feature.
+
+    Args:
+        X: Matriz (n amostras x p features) sem NaN
+
+    Returns:
+        Matriz R⁻¹ (p x p), ou None se R não for positiva definida
+    """
+    n_samples, n_features = X.shape
+
+    Xs = X - X.mean(axis=0)
+    Xs /= Xs.std(axis=0)
+    R = (Xs.T @ Xs) / n_samples
+
+    try:
+        return cho_solve(cho_factor(R), np.eye(n_features))
+    except (LinAlgError, ValueError):
+        return None
+
+
+def _vif_from_correlation(X: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Calcula o VIF de todas as colunas de uma vez.
+
+    Args:
+        X: Matriz (n amostras x p features) sem NaN
+
+    Returns:
+        Array com o VIF de cada coluna, ou None se R não for positiva definida
+    """
+    R_inv = _correlation_inverse(X)
+
+    if R_inv is None:
+        return None
+
+    return np.diag(R_inv).astype(np.float64)
+
+
+def _drop_from_inverse(R_inv: np.ndarray, j: int) -> np.ndarray:
+    """
+    Remove a feature j de R⁻¹ sem reinverter a matriz.
+
+    Pelo complemento de Schur, a inversa da correlação sem a linha/coluna j
+    é R⁻¹[-j,-j] - R⁻¹[-j,j] R⁻¹[j,-j] / R⁻¹[j,j], em O(p²) em vez de O(p³).
+
+    Args:
+        R_inv: Inversa da matriz de correlação (p x p)
+        j: Índice da feature removida
+
+    Returns:
+        Inversa da matriz de correlação (p-1 x p-1)
+    """
+    mask = np.arange(R_inv.shape[0]) != j
+    col = R_inv[mask, j]
+
+    return R_inv[np.ix_(mask, mask)] - np.outer(col, col) / R_inv[j, j]
+
+
+def _safe_vif(exog: np.ndarray, i: int) -> float:
+    """
+    VIF da coluna i de `exog` (coluna 0 = intercepto), NaN em caso de erro.
+
+    Regride a coluna i contra as demais via QR com pivoteamento (LAPACK
+    direto, sem os objetos de resultado do statsmodels). O resíduo sai da
+    projeção nas colunas de posto completo de Q, então colinearidade exata
+    resulta em VIF infinito em vez de erro.
+
+    Args:
+        exog: Matriz com intercepto na primeira coluna
+        i: Índice da coluna em `exog`
+
+    Returns:
+        VIF da coluna, ou NaN se o cálculo falhar
+    """
+    try:
+        mask = np.arange(exog.shape[1]) != i
+        y = exog[:, i]
+
+        Q, R, _ = qr(exog[:, mask], mode="economic", pivoting=True)
+        diag = np.abs(np.diag(R))
+        tol = diag.max() * max(exog.shape) * np.finfo(np.float64).eps
+        Q = Q[:, diag > tol]
+
+        resid = y - Q @ (Q.T @ y)
+        ssr = resid @ resid
+        sst = ((y - y.mean()) ** 2).sum()
+
+        # VIF = 1 / (1 - R²) = SST / SSR; resíduo no nível do erro de
+        # arredondamento indica colinearidade exata
+        if ssr <= sst * max(exog.shape) * np.finfo(np.float64).eps:
+            return np.inf
+        return sst / ssr
+    except (LinAlgError, ValueError) as e:
+        logger.warning(f"Erro ao calcular VIF da coluna {i - 1}: {str(e)}")
+        return np.nan
+
+
+def _vif_per_feature(X: np.ndarray, n_jobs: int = 1) -> np.ndarray:
+    """
+    Calcula o VIF regressão a regressão (caminho lento, usado como fallback).
+
+    Inclui intercepto para ser consistente com o VIF via correlação. Cada
+    regressão é independente e o LAPACK libera o GIL, então com muitas
+    features elas são distribuídas entre threads.
+
+    Args:
+        X: Matriz (n amostras x p features) sem NaN
+        n_jobs: Número de threads (-1 = todos os núcleos)
+
+    Returns:
+        Array com o VIF de cada coluna (NaN onde o cálculo falhou)
+    """
+    exog = np.column_stack([np.ones(len(X)), X])
+    indices = range(1, X.shape[1] + 1)
+
+    if n_jobs == 1 or X.shape[1] < PARALLEL_MIN_FEATURES:
+        return np.array([_safe_vif(exog, i) for i in indices], dtype=np.float64)
+
+    results = Parallel(n_jobs=n_jobs, backend="threading")(
+        delayed(_safe_vif)(exog, i) for i in indices
+    )
+
+    return np.array(results, dtype=np.float64)
+
 
 class VIFAnalyzer:
     """
@@ -33,7 +168,9 @@ class VIFAnalyzer:
     def __init__(
         self,
         threshold: float = 10.0,
-        warning_threshold: float = 5.0
+        warning_threshold: float = 5.0,
+        n_jobs: int = -1,
+        dtype: type = np.float64
     ):
         """
         Inicializa o analisador VIF.
@@ -41,32 +178,37 @@ class VIFAnalyzer:
         Args:
             threshold: Limite superior para VIF (features acima serão marcadas para remoção)
             warning_threshold: Limite de aviso (features acima serão marcadas com warning)
+            n_jobs: Threads usadas no cálculo VIF feature a feature (-1 = todos)
+            dtype: Precisão da álgebra linear (np.float32 dobra a vazão do BLAS
+                e basta para comparar com os limites 5/10; np.float64 = exato)
         """
         self.threshold = threshold
         self.warning_threshold = warning_threshold
+        self.n_jobs = n_jobs
+        self.dtype = dtype
         self.vif_results: Optional[pd.DataFrame] = None
 
-    def calculate_vif(
+    def _prepare_matrix(
         self,
         df: pd.DataFrame,
         features: Optional[List[str]] = None
-    ) -> pd.DataFrame:
+    ) -> Tuple[Optional[np.ndarray], List[str]]:
         """
-        Calcula VIF para todas as features numéricas.
+        Seleciona as features analisáveis e monta a matriz numérica.
 
         Args:
             df: DataFrame com features
             features: Lista de features a analisar (None = todas numéricas)
 
         Returns:
-            DataFrame com feature, VIF e status
+            Tuple (matriz em self.dtype sem NaN ou None se vazia, features mantidas)
         """
         # Selecionar features numéricas
         if features is None:
             features = df.select_dtypes(include=[np.number]).columns.tolist()
 
         # Remover colunas com valores constantes (VIF infinito)
-        df_clean = df[features].copy()
+        df_clean = df[features]
         constant_cols = [col for col in df_clean.columns if df_clean[col].nunique() <= 1]
 
         if constant_cols:
@@ -79,44 +221,68 @@ class VIFAnalyzer:
 
         if len(df_clean) == 0:
             logger.error("Nenhuma linha válida após remoção de NaN")
+            return None, features
+
+        return df_clean.to_numpy(dtype=self.dtype), features
+
+    def _build_vif_frame(self, features: List[str], vif_values: np.ndarray) -> pd.DataFrame:
+        """
+        Monta o DataFrame de resultados a partir dos VIFs calculados.
+
+        Args:
+            features: Nomes das features, na ordem de `vif_values`
+            vif_values: VIF de cada feature (NaN = falha no cálculo)
+
+        Returns:
+            DataFrame com feature, VIF, status e severity, ordenado por VIF
+        """
+        # NaN indica falha no cálculo: reportado como VIF infinito com status ERRO
+        errors = np.isnan(vif_values)
+        for feature in np.asarray(features)[errors]:
+            logger.warning(f"Erro ao calcular VIF para {feature}")
+        vif_values = np.where(errors, np.inf, vif_values)
+
+        high = vif_values > self.threshold
+        moderate = vif_values > self.warning_threshold
+
+        vif_data = pd.DataFrame({
+            "feature": features,
+            "vif": vif_values,
+            "status": np.select([errors, high, moderate], ["ERRO", "REMOVER", "ATENÇÃO"], default="OK"),
+            "severity": np.select([errors, high, moderate], ["error", "high", "moderate"], default="low")
+        })
+
+        # Ordenar por VIF (maior primeiro)
+        return vif_data.sort_values("vif", ascending=False)
+
+    def calculate_vif(
+        self,
+        df: pd.DataFrame,
+        features: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Calcula VIF para todas as features numéricas.
+
+        Args:
+            df: DataFrame com features
+            features: Lista de features a analisar (None = todas numéricas)
+
+        Returns:
+            DataFrame com feature, VIF e status
+        """
+        X, features = self._prepare_matrix(df, features)
+
+        if X is None:
             return pd.DataFrame()
 
-        # Calcular VIF para cada feature
-        vif_data = []
-
-        for i, feature in enumerate(features):
-            try:
-                vif_value = variance_inflation_factor(df_clean.values, i)
-
-                # Determinar status
-                if vif_value > self.threshold:
-                    status = "REMOVER"
-                    severity = "high"
-                elif vif_value > self.warning_threshold:
-                    status = "ATENÇÃO"
-                    severity = "moderate"
-                else:
-                    status = "OK"
-                    severity = "low"
-
-                vif_data.append({
-                    "feature": feature,
-                    "vif": vif_value,
-                    "status": status,
-                    "severity": severity
-                })
-
-            except Exception as e:
-                logger.warning(f"Erro ao calcular VIF para {feature}: {str(e)}")
-                vif_data.append({
-                    "feature": feature,
-                    "vif": np.inf,
-                    "status": "ERRO",
-                    "severity": "error"
-                })
-
-        # Criar DataFrame e ordenar por VIF (maior primeiro)
-        vif_df = pd.DataFrame(vif_data).sort_values("vif", ascending=False)
+        # Calcular VIF de todas as features via inversa da matriz de correlação
+        vif_values = _vif_from_correlation(X)
+
+        if vif_values is None:
+            logger.warning("Matriz de correlação singular; calculando VIF por feature")
+            vif_values = _vif_per_feature(X.astype(np.float64), n_jobs=self.n_jobs)
+
+        vif_df = self._build_vif_frame(features, vif_values)
         self.vif_results = vif_df
 
         # Log resumo
@@ -167,6 +333,8 @@ class VIFAnalyzer:
 
         O processo remove a feature com maior VIF, recalcula, e repete
         até que todas as features tenham VIF aceitável ou atingir max_iterations.
+        A inversa da matriz de correlação é calculada uma única vez e
+        atualizada a cada remoção, sem nova inversão.
 
         Args:
             df: DataFrame original
@@ -176,7 +344,73 @@ class VIFAnalyzer:
         Returns:
             Tuple (DataFrame sem features de alto VIF, lista de features removidas)
         """
-        df_clean = df.copy()
+        X, features = self._prepare_matrix(df)
+        R_inv = _correlation_inverse(X) if X is not None else None
+
+        if R_inv is None:
+            # Matriz singular: recalcular o VIF completo a cada iteração
+            return self._remove_high_vif_recompute(df, max_iterations)
+
+        removed_features = []
+
+        for iteration in range(max_iterations):
+            vif_values = np.diag(R_inv).astype(np.float64)
+
+            if len(vif_values) == 0 or vif_values.max() <= self.threshold:
+                logger.info(
+                    f"Convergência alcançada após {iteration} iterações. "
+                    f"Todas features têm VIF <= {self.threshold}"
+                )
+                break
+
+            # Remover feature com maior VIF
+            worst = int(np.argmax(vif_values))
+            worst_feature = features.pop(worst)
+
+            logger.info(
+                f"Iteração {iteration + 1}: Removendo '{worst_feature}' "
+                f"(VIF = {vif_values[worst]:.2f})"
+            )
+
+            R_inv = _drop_from_inverse(R_inv, worst)
+            removed_features.append(worst_feature)
+        else:
+            logger.warning(
+                f"Máximo de iterações ({max_iterations}) atingido. "
+                f"Ainda existem features com VIF alto."
+            )
+
+        # VIF das features restantes, para generate_report/get_high_vif_features
+        self.vif_results = self._build_vif_frame(features, np.diag(R_inv).astype(np.float64))
+
+        df_clean = df.drop(columns=removed_features)
+
+        logger.info(
+            f"Remoção VIF completa | Features removidas: {len(removed_features)} | "
+            f"Features restantes: {len(df_clean.columns)}"
+        )
+
+        return df_clean, removed_features
+
+    def _remove_high_vif_recompute(
+        self,
+        df: pd.DataFrame,
+        max_iterations: int = 10
+    ) -> Tuple[pd.DataFrame, List[str]]:
+        """
+        Remoção iterativa recalculando o VIF completo a cada passo.
+
+        Usado quando a matriz de correlação inicial é singular e não há
+        inversa para atualizar.
+
+        Args:
+            df: DataFrame original
+            max_iterations: Número máximo de iterações
+
+        Returns:
+            Tuple (DataFrame sem features de alto VIF, lista de features removidas)
+        """
+        df_clean = df
         removed_features = []
 
         for iteration in range(max_iterations):
@@ -259,25 +493,22 @@ class VIFAnalyzer:
         corr_matrix = self.get_correlation_matrix(df, features)
 
         # Extrair apenas triangulo superior (evitar duplicatas)
-        corr_pairs = []
-
-        for i in range(len(corr_matrix.columns)):
-            for j in range(i + 1, len(corr_matrix.columns)):
-                corr_value = corr_matrix.iloc[i, j]
-
-                if abs(corr_value) >= threshold:
-                    corr_pairs.append({
-                        "feature_1": corr_matrix.columns[i],
-                        "feature_2": corr_matrix.columns[j],
-                        "correlation": corr_value,
-                        "abs_correlation": abs(corr_value)
-                    })
+        corr_values = corr_matrix.to_numpy()
+        iu, ju = np.triu_indices(corr_values.shape[0], k=1)
+        pair_values = corr_values[iu, ju]
+        mask = np.abs(pair_values) >= threshold
+        iu, ju, pair_values = iu[mask], ju[mask], pair_values[mask]
 
-        if len(corr_pairs) == 0:
+        if len(pair_values) == 0:
             logger.info(f"Nenhum par com correlação >= {threshold}")
             return pd.DataFrame()
 
-        corr_df = pd.DataFrame(corr_pairs).sort_values("abs_correlation", ascending=False)
+        corr_df = pd.DataFrame({
+            "feature_1": corr_matrix.columns[iu],
+            "feature_2": corr_matrix.columns[ju],
+            "correlation": pair_values,
+            "abs_correlation": np.abs(pair_values)
+        }).sort_values("abs_correlation", ascending=False)
 
         logger.info(f"Encontrados {len(corr_df)} pares com correlação >= {threshold}")
 
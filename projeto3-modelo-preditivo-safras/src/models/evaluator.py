@@ -2,24 +2,23 @@
 Avaliador de Modelos com Visualizações e Métricas.
 """
 
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, TYPE_CHECKING
 from pathlib import Path
+from importlib.util import find_spec
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import (
-    mean_squared_error,
-    mean_absolute_error,
-    r2_score,
-    mean_absolute_percentage_error
-)
 from loguru import logger
 
-# Plotly para gráficos interativos
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from .metrics import regression_metrics, top_n_indices
+
+# tabulate (opcional) é usado por DataFrame.to_markdown no relatório
+TABULATE_AVAILABLE = find_spec("tabulate") is not None
+
+# Plotly/scipy são importados dentro dos métodos que os usam, para que importar
+# o avaliador (ex: via src.models) não carregue tudo; matplotlib só é carregado
+# por enable_matplotlib_style
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
 
 class ModelEvaluator:
@@ -34,6 +33,24 @@ class ModelEvaluator:
     - Learning curves
     """
 
+    # Máximo de pontos desenhados no Q-Q plot
+    QQ_MAX_POINTS = 5000
+
+    # plotly.js via CDN: cada HTML fica com alguns KB em vez de ~3 MB
+    _HTML_OPTS = dict(include_plotlyjs="cdn", full_html=True, config={"responsive": True})
+
+    # Faixas de diagnóstico do relatório: (limite, mensagem)
+    _R2_DIAGNOSTICS = (
+        (0.9, "- [OK] Excelente poder explicativo (R2 >= 0.9)"),
+        (0.7, "- [OK] Bom poder explicativo (R2 >= 0.7)"),
+        (-np.inf, "- [ATENCAO] Poder explicativo moderado/baixo (R2 < 0.7)"),
+    )
+    _MAPE_DIAGNOSTICS = (
+        (10, "- [OK] Erro percentual baixo (MAPE <= 10%)"),
+        (20, "- [OK] Erro percentual aceitavel (MAPE <= 20%)"),
+        (np.inf, "- [ATENCAO] Erro percentual elevado (MAPE > 20%)"),
+    )
+
     def __init__(self, output_dir: Optional[str] = None):
         """
         Inicializa o avaliador.
@@ -44,7 +61,15 @@ class ModelEvaluator:
         self.output_dir = Path(output_dir) if output_dir else Path("outputs/figures")
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Configurar estilo
+    @staticmethod
+    def enable_matplotlib_style():
+        """
+        Aplica o estilo padrão do projeto ao matplotlib.
+
+        Os gráficos do avaliador são Plotly; chame apenas se for gerar figuras
+        matplotlib junto com eles (o import fica restrito a esse caso).
+        """
+        import matplotlib.pyplot as plt
         plt.style.use("seaborn-v0_8-whitegrid")
         plt.rcParams["figure.figsize"] = (12, 6)
         plt.rcParams["font.size"] = 12
@@ -64,14 +89,7 @@ class ModelEvaluator:
         Returns:
             Dicionário com métricas
         """
-        return {
-            "rmse": np.sqrt(mean_squared_error(y_true, y_pred)),
-            "mae": mean_absolute_error(y_true, y_pred),
-            "r2": r2_score(y_true, y_pred),
-            "mape": mean_absolute_percentage_error(y_true, y_pred) * 100,
-            "max_error": np.max(np.abs(y_true - y_pred)),
-            "median_ae": np.median(np.abs(y_true - y_pred))
-        }
+        return regression_metrics(y_true, y_pred)
 
     def plot_predictions_vs_actual(
         self,
@@ -79,7 +97,7 @@ class ModelEvaluator:
         y_pred: np.ndarray,
         title: str = "Predições vs Valores Reais",
         save: bool = True
-    ) -> go.Figure:
+    ) -> "go.Figure":
         """
         Gráfico de dispersão: Predições vs Valores Reais.
 
@@ -92,6 +110,8 @@ class ModelEvaluator:
         Returns:
             Figura Plotly
         """
+        import plotly.graph_objects as go
+
         metrics = self.calculate_metrics(y_true, y_pred)
 
         fig = go.Figure()
@@ -151,7 +171,7 @@ class ModelEvaluator:
         )
 
         if save:
-            fig.write_html(self.output_dir / "predictions_vs_actual.html")
+            fig.write_html(self.output_dir / "predictions_vs_actual.html", **self._HTML_OPTS)
 
         return fig
 
@@ -161,7 +181,7 @@ class ModelEvaluator:
         y_pred: np.ndarray,
         title: str = "Análise de Resíduos",
         save: bool = True
-    ) -> go.Figure:
+    ) -> "go.Figure":
         """
         Gráfico de análise de resíduos.
 
@@ -174,7 +194,12 @@ class ModelEvaluator:
         Returns:
             Figura Plotly
         """
-        residuals = y_true - y_pred
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+        from scipy import stats
+
+        # Mantém o dtype de entrada (float32 reduz o payload serializado)
+        residuals = np.asarray(y_true) - np.asarray(y_pred)
 
         fig = make_subplots(
             rows=2, cols=2,
@@ -210,17 +235,20 @@ class ModelEvaluator:
             row=1, col=2
         )
 
-        # 3. Q-Q Plot (aproximado)
-        from scipy import stats
-        theoretical_quantiles = stats.norm.ppf(
-            np.linspace(0.01, 0.99, len(residuals))
+        # 3. Q-Q Plot
+        (osm, osr), (slope, intercept, _) = stats.probplot(
+            np.asarray(residuals, dtype=np.float64), dist="norm", fit=True
         )
-        sorted_residuals = np.sort(residuals)
+
+        # Amostra uniforme sobre os quantis ordenados (preserva as caudas)
+        if len(osm) > self.QQ_MAX_POINTS:
+            idx = np.linspace(0, len(osm) - 1, self.QQ_MAX_POINTS).astype(np.intp)
+            osm, osr = osm[idx], osr[idx]
 
         fig.add_trace(
             go.Scatter(
-                x=theoretical_quantiles,
-                y=sorted_residuals,
+                x=osm,
+                y=osr,
                 mode="markers",
                 name="Q-Q"
             ),
@@ -229,8 +257,8 @@ class ModelEvaluator:
         # Linha de referência Q-Q
         fig.add_trace(
             go.Scatter(
-                x=theoretical_quantiles,
-                y=theoretical_quantiles * np.std(residuals) + np.mean(residuals),
+                x=osm,
+                y=osm * slope + intercept,
                 mode="lines",
                 line=dict(color="red", dash="dash"),
                 name="Normal"
@@ -241,7 +269,7 @@ class ModelEvaluator:
         # 4. Resíduos sequenciais
         fig.add_trace(
             go.Scatter(
-                x=list(range(len(residuals))),
+                x=np.arange(len(residuals), dtype=np.int32),
                 y=residuals,
                 mode="lines+markers",
                 marker=dict(size=4),
@@ -258,7 +286,7 @@ class ModelEvaluator:
         )
 
         if save:
-            fig.write_html(self.output_dir / "residuals_analysis.html")
+            fig.write_html(self.output_dir / "residuals_analysis.html", **self._HTML_OPTS)
 
         return fig
 
@@ -268,7 +296,7 @@ class ModelEvaluator:
         metric: str = "rmse",
         title: str = "Comparação de Modelos",
         save: bool = True
-    ) -> go.Figure:
+    ) -> "go.Figure":
         """
         Gráfico de comparação entre modelos.
 
@@ -281,12 +309,15 @@ class ModelEvaluator:
         Returns:
             Figura Plotly
         """
+        import plotly.graph_objects as go
+        import plotly.express as px
+
         df = results_df.sort_values(metric)
 
         # Cores baseadas na performance
         colors = px.colors.sample_colorscale(
             "RdYlGn_r",
-            [i / len(df) for i in range(len(df))]
+            np.linspace(0, 1, len(df), endpoint=False)
         )
 
         fig = go.Figure()
@@ -307,7 +338,7 @@ class ModelEvaluator:
         )
 
         if save:
-            fig.write_html(self.output_dir / "model_comparison.html")
+            fig.write_html(self.output_dir / "model_comparison.html", **self._HTML_OPTS)
 
         return fig
 
@@ -317,7 +348,7 @@ class ModelEvaluator:
         top_n: int = 20,
         title: str = "Importância das Features",
         save: bool = True
-    ) -> go.Figure:
+    ) -> "go.Figure":
         """
         Gráfico de importância das features.
 
@@ -330,7 +361,11 @@ class ModelEvaluator:
         Returns:
             Figura Plotly
         """
-        df = importance_df.head(top_n).sort_values("importance")
+        import plotly.graph_objects as go
+
+        # Top-N por seleção parcial, em ordem crescente para o gráfico horizontal
+        idx = top_n_indices(importance_df["importance"].to_numpy(), top_n)[::-1]
+        df = importance_df.iloc[idx]
 
         fig = go.Figure()
 
@@ -352,7 +387,7 @@ class ModelEvaluator:
         )
 
         if save:
-            fig.write_html(self.output_dir / "feature_importance.html")
+            fig.write_html(self.output_dir / "feature_importance.html", **self._HTML_OPTS)
 
         return fig
 
@@ -363,7 +398,7 @@ class ModelEvaluator:
         val_scores: np.ndarray,
         title: str = "Curva de Aprendizado",
         save: bool = True
-    ) -> go.Figure:
+    ) -> "go.Figure":
         """
         Gráfico de curva de aprendizado.
 
@@ -377,10 +412,13 @@ class ModelEvaluator:
         Returns:
             Figura Plotly
         """
-        train_mean = np.mean(train_scores, axis=1)
-        train_std = np.std(train_scores, axis=1)
-        val_mean = np.mean(val_scores, axis=1)
-        val_std = np.std(val_scores, axis=1)
+        import plotly.graph_objects as go
+
+        train_mean, train_std = self._mean_std(train_scores)
+        val_mean, val_std = self._mean_std(val_scores)
+
+        # Contorno x das faixas ± std (ida e volta), compartilhado pelas duas
+        band_x = np.concatenate([train_sizes, train_sizes[::-1]])
 
         fig = go.Figure()
 
@@ -393,11 +431,8 @@ class ModelEvaluator:
             line=dict(color="blue")
         ))
         fig.add_trace(go.Scatter(
-            x=np.concatenate([train_sizes, train_sizes[::-1]]),
-            y=np.concatenate([
-                train_mean - train_std,
-                (train_mean + train_std)[::-1]
-            ]),
+            x=band_x,
+            y=self._band(train_mean, train_std),
             fill="toself",
             fillcolor="rgba(0,0,255,0.1)",
             line=dict(color="rgba(255,255,255,0)"),
@@ -413,11 +448,8 @@ class ModelEvaluator:
             line=dict(color="green")
         ))
         fig.add_trace(go.Scatter(
-            x=np.concatenate([train_sizes, train_sizes[::-1]]),
-            y=np.concatenate([
-                val_mean - val_std,
-                (val_mean + val_std)[::-1]
-            ]),
+            x=band_x,
+            y=self._band(val_mean, val_std),
             fill="toself",
             fillcolor="rgba(0,255,0,0.1)",
             line=dict(color="rgba(255,255,255,0)"),
@@ -431,10 +463,45 @@ class ModelEvaluator:
         )
 
         if save:
-            fig.write_html(self.output_dir / "learning_curve.html")
+            fig.write_html(self.output_dir / "learning_curve.html", **self._HTML_OPTS)
 
         return fig
 
+    @staticmethod
+    def _mean_std(scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Média e desvio padrão por linha, reaproveitando a média no desvio.
+
+        Args:
+            scores: Matriz (tamanhos x folds)
+
+        Returns:
+            Tuple (média, desvio padrão)
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        mean = scores.mean(axis=1)
+        centered = scores - mean[:, None]
+        std = np.sqrt(np.einsum("ij,ij->i", centered, centered) / scores.shape[1])
+        return mean, std
+
+    @staticmethod
+    def _band(mean: np.ndarray, std: np.ndarray) -> np.ndarray:
+        """
+        Contorno y de uma faixa mean ± std (inferior na ida, superior na volta).
+
+        Args:
+            mean: Médias
+            std: Desvios padrão
+
+        Returns:
+            Array com 2 * len(mean) pontos
+        """
+        n = len(mean)
+        band = np.empty(2 * n)
+        np.subtract(mean, std, out=band[:n])
+        np.add(mean[::-1], std[::-1], out=band[n:])
+        return band
+
     def generate_report(
         self,
         y_true: np.ndarray,
@@ -456,7 +523,7 @@ class ModelEvaluator:
         """
         metrics = self.calculate_metrics(y_true, y_pred)
 
-        report = f"""
+        parts = [f"""
 # Relatório de Avaliação do Modelo
 
 ## Modelo: {model_name}
@@ -479,32 +546,40 @@ class ModelEvaluator:
 - **MAPE = {metrics['mape']:.2f}%**: Erro percentual médio das predições
 
 ### Diagnóstico
+"""]
 
-"""
-        # Diagnóstico baseado nas métricas
-        if metrics['r2'] >= 0.9:
-            report += "- [OK] Excelente poder explicativo (R2 >= 0.9)\n"
-        elif metrics['r2'] >= 0.7:
-            report += "- [OK] Bom poder explicativo (R2 >= 0.7)\n"
-        else:
-            report += "- [ATENCAO] Poder explicativo moderado/baixo (R2 < 0.7)\n"
-
-        if metrics['mape'] <= 10:
-            report += "- [OK] Erro percentual baixo (MAPE <= 10%)\n"
-        elif metrics['mape'] <= 20:
-            report += "- [OK] Erro percentual aceitavel (MAPE <= 20%)\n"
-        else:
-            report += "- [ATENCAO] Erro percentual elevado (MAPE > 20%)\n"
+        # Diagnóstico baseado nas métricas (primeira faixa satisfeita)
+        parts.append(next(
+            (msg for limit, msg in self._R2_DIAGNOSTICS if metrics['r2'] >= limit),
+            self._R2_DIAGNOSTICS[-1][1]
+        ))
+        parts.append(next(
+            (msg for limit, msg in self._MAPE_DIAGNOSTICS if metrics['mape'] <= limit),
+            self._MAPE_DIAGNOSTICS[-1][1]
+        ))
 
         # Feature importance
         if feature_importance is not None:
-            report += "\n### Top 10 Features Mais Importantes\n\n"
-            report += "| Rank | Feature | Importância |\n"
-            report += "|------|---------|-------------|\n"
-            for i, row in feature_importance.head(10).iterrows():
-                report += f"| {i+1} | {row['feature']} | {row['importance']:.4f} |\n"
-
-        report += f"\n---\n*Relatório gerado automaticamente*\n"
+            top = feature_importance.head(10)
+            parts.append("\n### Top 10 Features Mais Importantes\n")
+            if TABULATE_AVAILABLE:
+                table = top[["feature", "importance"]].rename(
+                    columns={"feature": "Feature", "importance": "Importância"}
+                )
+                table.index = pd.RangeIndex(1, len(table) + 1, name="Rank")
+                parts.append(table.to_markdown(floatfmt=".4f"))
+            else:
+                parts.append("| Rank | Feature | Importância |")
+                parts.append("|------|---------|-------------|")
+                parts.extend(
+                    f"| {rank} | {feature} | {importance:.4f} |"
+                    for rank, (feature, importance) in enumerate(
+                        zip(top["feature"].to_numpy(), top["importance"].to_numpy()), start=1
+                    )
+                )
+
+        parts.append("\n---\n*Relatório gerado automaticamente*\n")
+        report = "\n".join(parts)
 
         # Salvar relatório
         report_path = self.output_dir / f"report_{model_name}.md"
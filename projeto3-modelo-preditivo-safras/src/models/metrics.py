@@ -0,0 +1,81 @@
+"""
+Métricas de regressão calculadas em uma única passada sobre os arrays.
+"""
+
+from typing import Dict
+import numpy as np
+
+
+def regression_metrics(y_true, y_pred) -> Dict[str, float]:
+    """
+    Calcula RMSE, MAE, R², MAPE, erro máximo e mediana do erro absoluto.
+
+    Equivalente às funções do sklearn.metrics, mas converte as entradas uma
+    única vez e reaproveita o erro e o erro absoluto em todas as métricas.
+
+    Args:
+        y_true: Valores reais (array ou Series)
+        y_pred: Valores preditos (array ou Series)
+
+    Returns:
+        Dicionário com métricas
+    """
+    y_true = np.asarray(y_true, dtype=np.float64).ravel()
+    y_pred = np.asarray(y_pred, dtype=np.float64).ravel()
+
+    if y_true.shape != y_pred.shape:
+        raise ValueError(
+            f"y_true e y_pred com tamanhos diferentes: {len(y_true)} != {len(y_pred)}"
+        )
+    if len(y_true) == 0:
+        raise ValueError("Métricas indefinidas para arrays vazios")
+
+    diff = y_true - y_pred
+    abs_diff = np.abs(diff)
+    abs_true = np.abs(y_true)
+
+    sse = diff @ diff
+    centered = y_true - y_true.mean()
+    sst = centered @ centered
+
+    # Mesma convenção do sklearn para y_true constante
+    if sst > 0:
+        r2 = 1.0 - sse / sst
+    else:
+        r2 = 1.0 if sse == 0 else 0.0
+
+    # sklearn usa eps no denominador para evitar divisão por zero
+    eps = np.finfo(np.float64).eps
+
+    return {
+        "rmse": float(np.sqrt(sse / len(diff))),
+        "mae": float(abs_diff.mean()),
+        "r2": float(r2),
+        "mape": float((abs_diff / np.maximum(abs_true, eps)).mean() * 100),
+        "max_error": float(abs_diff.max()),
+        "median_ae": float(np.median(abs_diff))
+    }
+
+
+def top_n_indices(values, top_n: int) -> np.ndarray:
+    """
+    Índices dos top_n maiores valores, em ordem decrescente.
+
+    Usa np.argpartition (O(n)) e ordena apenas os top_n selecionados.
+
+    Args:
+        values: Array de valores (ex: importâncias)
+        top_n: Quantidade de índices a retornar
+
+    Returns:
+        Array de índices ordenados do maior para o menor valor
+    """
+    neg = -np.asarray(values, dtype=np.float64)
+
+    if top_n >= len(neg):
+        return np.argsort(neg, kind="stable")
+    if top_n <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    idx = np.argpartition(neg, top_n - 1)[:top_n]
+    return idx[np.argsort(neg[idx], kind="stable")]
@@ -4,12 +4,17 @@ Treinador de Modelos de Machine Learning para Predição de Safras.
 
 from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
+from functools import lru_cache
+from importlib import import_module
+from importlib.util import find_spec
 import pickle
 import json
 from datetime import datetime
 
 import pandas as pd
 import numpy as np
+import joblib
+from joblib import Parallel, delayed
 from sklearn.linear_model import LinearRegression, Ridge, Lasso, ElasticNet
 from sklearn.ensemble import (
     RandomForestRegressor,
@@ -18,42 +23,107 @@ from sklearn.ensemble import (
 )
 from sklearn.svm import SVR
 from sklearn.neighbors import KNeighborsRegressor
-from sklearn.model_selection import cross_val_score, GridSearchCV
-from sklearn.metrics import (
-    mean_squared_error,
-    mean_absolute_error,
-    r2_score,
-    mean_absolute_percentage_error
-)
+from sklearn.model_selection import cross_val_score, GridSearchCV, KFold
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV
 
 from loguru import logger
 
-# Importações condicionais para bibliotecas opcionais
-try:
-    from xgboost import XGBRegressor
-    XGBOOST_AVAILABLE = True
-except ImportError:
-    XGBOOST_AVAILABLE = False
+# Bibliotecas opcionais: apenas verifica a instalação aqui; o import
+# (centenas de ms e memória) fica para o primeiro uso do modelo
+XGBOOST_AVAILABLE = find_spec("xgboost") is not None
+if not XGBOOST_AVAILABLE:
     logger.warning("XGBoost não disponível")
 
-try:
-    from lightgbm import LGBMRegressor
-    LIGHTGBM_AVAILABLE = True
-except ImportError:
-    LIGHTGBM_AVAILABLE = False
+LIGHTGBM_AVAILABLE = find_spec("lightgbm") is not None
+if not LIGHTGBM_AVAILABLE:
     logger.warning("LightGBM não disponível")
 
+CATBOOST_AVAILABLE = find_spec("catboost") is not None
+if not CATBOOST_AVAILABLE:
+    logger.warning("CatBoost não disponível")
+
 try:
-    from catboost import CatBoostRegressor
-    CATBOOST_AVAILABLE = True
+    import lz4  # noqa: F401
+    LZ4_AVAILABLE = True
 except ImportError:
-    CATBOOST_AVAILABLE = False
-    logger.warning("CatBoost não disponível")
+    LZ4_AVAILABLE = False
 
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from config.settings import settings
+from src.models.metrics import regression_metrics, top_n_indices
+
+
+def _fit_estimator(model: Any, X_train: pd.DataFrame, y_train: pd.Series) -> Tuple[Any, Optional[str]]:
+    """
+    Treina um estimador já instanciado (executável em processo separado).
+
+    Args:
+        model: Estimador não treinado
+        X_train: Features de treino
+        y_train: Target de treino
+
+    Returns:
+        Tuple (modelo treinado ou None, mensagem de erro ou None)
+    """
+    try:
+        return model.fit(X_train, y_train), None
+    except Exception as e:
+        return None, str(e)
+
+
+@lru_cache(maxsize=None)
+def _load_optional(path: str) -> type:
+    """
+    Importa a classe de um modelo opcional sob demanda.
+
+    Args:
+        path: Caminho no formato 'modulo:Classe' (ex: 'xgboost:XGBRegressor')
+
+    Returns:
+        Classe do modelo
+    """
+    module_name, class_name = path.split(":")
+    return getattr(import_module(module_name), class_name)
+
+
+def _predict(
+    model: Any,
+    X: pd.DataFrame,
+    batch_size: Optional[int] = None,
+    n_jobs: Optional[int] = None
+) -> np.ndarray:
+    """
+    Gera predições em blocos de linhas, opcionalmente com mais threads.
+
+    Args:
+        model: Modelo treinado
+        X: Features
+        batch_size: Linhas por bloco (None = tudo de uma vez)
+        n_jobs: n_jobs temporário do modelo durante a predição (None = manter)
+
+    Returns:
+        Array com as predições
+    """
+    params = model.get_params() if n_jobs is not None else {}
+    restore = "n_jobs" in params
+    if restore:
+        model.set_params(n_jobs=n_jobs)
+
+    try:
+        if batch_size is None or len(X) <= batch_size:
+            return model.predict(X)
+
+        rows = X.iloc if isinstance(X, pd.DataFrame) else X
+        return np.concatenate([
+            model.predict(rows[start:start + batch_size])
+            for start in range(0, len(X), batch_size)
+        ])
+    finally:
+        if restore:
+            model.set_params(n_jobs=params["n_jobs"])
 
 
 class ModelTrainer:
@@ -79,15 +149,15 @@ class ModelTrainer:
         "knn": KNeighborsRegressor
     }
 
-    # Adicionar modelos opcionais se disponíveis
+    # Adicionar modelos opcionais se disponíveis (importados no primeiro uso)
     if XGBOOST_AVAILABLE:
-        MODELS["xgboost"] = XGBRegressor
+        MODELS["xgboost"] = "xgboost:XGBRegressor"
 
     if LIGHTGBM_AVAILABLE:
-        MODELS["lightgbm"] = LGBMRegressor
+        MODELS["lightgbm"] = "lightgbm:LGBMRegressor"
 
     if CATBOOST_AVAILABLE:
-        MODELS["catboost"] = CatBoostRegressor
+        MODELS["catboost"] = "catboost:CatBoostRegressor"
 
     # Hiperparâmetros padrão para GridSearch
     DEFAULT_PARAMS = {
@@ -121,6 +191,35 @@ class ModelTrainer:
         }
     }
 
+    # Parâmetros padrão de cada modelo (aplicados apenas se não informados)
+    _MODEL_DEFAULTS = {
+        "xgboost": {
+            "objective": "reg:squarederror",  # Regression task
+            "n_estimators": 100,
+            "max_depth": 5,
+            "learning_rate": 0.1,
+            "subsample": 0.8,  # Prevent overfitting
+            "colsample_bytree": 0.8,  # Feature sampling
+            "gamma": 0,  # Minimum loss reduction
+            "reg_alpha": 0,  # L1 regularization
+            "reg_lambda": 1,  # L2 regularization
+            "verbosity": 0,  # Silent mode
+            "n_jobs": -1  # Use all cores
+        },
+        "lightgbm": {"verbose": -1},
+        "catboost": {"verbose": False}
+    }
+
+    # Modelos baseados em árvores: convertem X para float32 internamente
+    # (ou binarizam), então recebem float32 direto e evitam a cópia em float64
+    FLOAT32_MODELS = {"random_forest", "gradient_boosting", "xgboost", "lightgbm", "catboost"}
+
+    # Linhas por bloco na predição: limita os buffers intermediários
+    PREDICT_BATCH_SIZE = 50_000
+
+    # Parâmetros aceitos por cada modelo, preenchido sob demanda
+    _MODEL_PARAMS: Dict[str, frozenset] = {}
+
     def __init__(self, random_state: int = 42):
         """
         Inicializa o treinador.
@@ -133,6 +232,7 @@ class ModelTrainer:
         self.results: Dict[str, Dict] = {}
         self.best_model_name: Optional[str] = None
         self.best_model: Optional[Any] = None
+        self._cv_splits: Dict[Tuple[int, int], List[Tuple[np.ndarray, np.ndarray]]] = {}
 
     def get_model(self, name: str, **kwargs) -> Any:
         """
@@ -148,33 +248,55 @@ class ModelTrainer:
         if name not in self.MODELS:
             raise ValueError(f"Modelo '{name}' não disponível. Opções: {list(self.MODELS.keys())}")
 
-        model_class = self.MODELS[name]
+        model_class = self._model_class(name)
 
         # Adicionar random_state se o modelo suportar
-        if "random_state" in model_class().get_params():
+        if "random_state" in self._model_params(name):
             kwargs.setdefault("random_state", self.random_state)
 
         # Configurações específicas para cada modelo
-        if name == "xgboost":
-            # XGBoost sensible defaults for regression
-            kwargs.setdefault("objective", "reg:squarederror")  # Regression task
-            kwargs.setdefault("n_estimators", 100)
-            kwargs.setdefault("max_depth", 5)
-            kwargs.setdefault("learning_rate", 0.1)
-            kwargs.setdefault("subsample", 0.8)  # Prevent overfitting
-            kwargs.setdefault("colsample_bytree", 0.8)  # Feature sampling
-            kwargs.setdefault("gamma", 0)  # Minimum loss reduction
-            kwargs.setdefault("reg_alpha", 0)  # L1 regularization
-            kwargs.setdefault("reg_lambda", 1)  # L2 regularization
-            kwargs.setdefault("verbosity", 0)  # Silent mode
-            kwargs.setdefault("n_jobs", -1)  # Use all cores
-        elif name == "lightgbm":
-            kwargs.setdefault("verbose", -1)
-        elif name == "catboost":
-            kwargs.setdefault("verbose", False)
+        for param, value in self._MODEL_DEFAULTS.get(name, {}).items():
+            kwargs.setdefault(param, value)
 
         return model_class(**kwargs)
 
+    @classmethod
+    def _model_class(cls, name: str) -> type:
+        """
+        Retorna a classe do modelo, importando os opcionais sob demanda.
+
+        Args:
+            name: Nome do modelo
+
+        Returns:
+            Classe do modelo
+        """
+        model_class = cls.MODELS[name]
+        if isinstance(model_class, str):
+            model_class = _load_optional(model_class)
+        return model_class
+
+    @classmethod
+    def _model_params(cls, name: str) -> frozenset:
+        """
+        Retorna os parâmetros aceitos pelo modelo.
+
+        O estimador é instanciado uma única vez por classe para inspecionar
+        get_params() (XGBoost/CatBoost repassam parâmetros via **kwargs, então
+        a assinatura do __init__ não basta); chamadas seguintes consultam o cache.
+
+        Args:
+            name: Nome do modelo
+
+        Returns:
+            Conjunto com os nomes dos parâmetros
+        """
+        params = cls._MODEL_PARAMS.get(name)
+        if params is None:
+            params = frozenset(cls._model_class(name)().get_params())
+            cls._MODEL_PARAMS[name] = params
+        return params
+
     def train_model(
         self,
         X_train: pd.DataFrame,
@@ -197,7 +319,7 @@ class ModelTrainer:
         logger.info(f"Treinando modelo: {model_name}")
 
         model = self.get_model(model_name, **kwargs)
-        model.fit(X_train, y_train)
+        model.fit(self._prepare_features(X_train, model_name), y_train)
 
         self.trained_models[model_name] = model
 
@@ -205,19 +327,72 @@ class ModelTrainer:
 
         return model
 
+    def _prepare_features(self, X: pd.DataFrame, model_name: str) -> pd.DataFrame:
+        """
+        Converte as colunas float64 para float32 nos modelos de árvore.
+
+        Colunas de outros tipos (ex: category no LightGBM) são mantidas.
+
+        Args:
+            X: Features
+            model_name: Nome do modelo
+
+        Returns:
+            Features no tipo preferido pelo modelo
+        """
+        if model_name not in self.FLOAT32_MODELS or not isinstance(X, pd.DataFrame):
+            return X
+
+        float64_cols = X.select_dtypes(include=[np.float64]).columns
+        if len(float64_cols) == 0:
+            return X
+
+        return X.astype({col: np.float32 for col in float64_cols})
+
+    def _features_by_model(self, X: pd.DataFrame, model_names: List[str]) -> List[pd.DataFrame]:
+        """
+        Features no tipo preferido por cada modelo, convertendo uma única vez.
+
+        Os modelos de árvore compartilham a mesma cópia em float32; os demais
+        recebem X sem cópia.
+
+        Args:
+            X: Features
+            model_names: Nomes dos modelos
+
+        Returns:
+            Lista com as features de cada modelo, na ordem de model_names
+        """
+        X_float32 = None
+        inputs = []
+        for name in model_names:
+            if name in self.FLOAT32_MODELS:
+                if X_float32 is None:
+                    X_float32 = self._prepare_features(X, name)
+                inputs.append(X_float32)
+            else:
+                inputs.append(X)
+        return inputs
+
     def train_multiple_models(
         self,
         X_train: pd.DataFrame,
         y_train: pd.Series,
-        models: Optional[List[str]] = None
+        models: Optional[List[str]] = None,
+        n_jobs: int = -1
     ) -> Dict[str, Any]:
         """
         Treina múltiplos modelos.
 
+        Os modelos são independentes, então são treinados em paralelo (um
+        processo por modelo). Nesse caso, modelos com paralelismo interno
+        recebem n_jobs=1 para não disputar os mesmos núcleos.
+
         Args:
             X_train: Features de treino
             y_train: Target de treino
             models: Lista de modelos a treinar (None = todos)
+            n_jobs: Processos para treinar modelos em paralelo (1 = sequencial)
 
         Returns:
             Dicionário de modelos treinados
@@ -227,13 +402,44 @@ class ModelTrainer:
 
         logger.info(f"Treinando {len(models)} modelos...")
 
+        # Conversões feitas uma única vez e compartilhadas entre os modelos
+        y_train = np.ascontiguousarray(np.asarray(y_train, dtype=np.float64).ravel())
+        inputs = dict(zip(models, self._features_by_model(X_train, models)))
+
+        if n_jobs == 1 or len(models) < 2:
+            for model_name in models:
+                try:
+                    self.train_model(inputs[model_name], y_train, model_name)
+                except Exception as e:
+                    logger.warning(f"Erro ao treinar {model_name}: {str(e)}")
+                    continue
+
+            return self.trained_models
+
+        # Instanciar no processo principal; só o treino vai para os workers
+        estimators = {}
         for model_name in models:
             try:
-                self.train_model(X_train, y_train, model_name)
+                kwargs = {}
+                if model_name in self.MODELS and "n_jobs" in self._model_params(model_name):
+                    kwargs["n_jobs"] = 1
+                estimators[model_name] = self.get_model(model_name, **kwargs)
             except Exception as e:
                 logger.warning(f"Erro ao treinar {model_name}: {str(e)}")
+
+        fitted = Parallel(n_jobs=n_jobs, backend="loky")(
+            delayed(_fit_estimator)(model, inputs[model_name], y_train)
+            for model_name, model in estimators.items()
+        )
+
+        for model_name, (model, error) in zip(estimators, fitted):
+            if error is not None:
+                logger.warning(f"Erro ao treinar {model_name}: {error}")
                 continue
 
+            self.trained_models[model_name] = model
+            logger.info(f"Modelo {model_name} treinado com sucesso")
+
         return self.trained_models
 
     def cross_validate(
@@ -259,7 +465,10 @@ class ModelTrainer:
         """
         model = self.get_model(model_name)
 
-        scores = cross_val_score(model, X, y, cv=cv, scoring=scoring)
+        scores = cross_val_score(
+            model, self._prepare_features(X, model_name), y,
+            cv=self._get_cv_splits(cv, len(X)), scoring=scoring
+        )
 
         results = {
             "model": model_name,
@@ -277,23 +486,48 @@ class ModelTrainer:
 
         return results
 
+    def _get_cv_splits(self, cv: int, n_samples: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Retorna os índices dos folds, calculados uma vez por (cv, n_amostras).
+
+        Usa o mesmo KFold sem embaralhamento que o sklearn aplica a
+        regressores quando recebe cv inteiro, então os folds não mudam.
+
+        Args:
+            cv: Número de folds
+            n_samples: Número de amostras
+
+        Returns:
+            Lista de tuplas (índices de treino, índices de validação)
+        """
+        key = (cv, n_samples)
+        if key not in self._cv_splits:
+            self._cv_splits[key] = list(KFold(n_splits=cv).split(np.empty((n_samples, 0))))
+        return self._cv_splits[key]
+
     def grid_search(
         self,
         X_train: pd.DataFrame,
         y_train: pd.Series,
         model_name: str,
         param_grid: Optional[Dict] = None,
-        cv: int = 5
+        cv: int = 5,
+        strategy: str = "halving"
     ) -> Tuple[Any, Dict]:
         """
         Realiza busca de hiperparâmetros com GridSearch.
 
+        Com strategy="halving" (successive halving), todas as combinações são
+        avaliadas em subamostras pequenas e apenas as melhores seguem para
+        subamostras maiores, com muito menos ajustes que a busca exaustiva.
+
         Args:
             X_train: Features de treino
             y_train: Target de treino
             model_name: Nome do modelo
             param_grid: Grade de parâmetros (None = usar padrão)
             cv: Número de folds
+            strategy: 'halving' (HalvingGridSearchCV) ou 'grid' (GridSearchCV exaustivo)
 
         Returns:
             Tuple (melhor_modelo, melhores_parâmetros)
@@ -302,20 +536,38 @@ class ModelTrainer:
 
         model = self.get_model(model_name)
         params = param_grid or self.DEFAULT_PARAMS.get(model_name, {})
+        X_train = self._prepare_features(X_train, model_name)
 
         if not params:
             logger.warning(f"Sem parâmetros para Grid Search de {model_name}")
             model.fit(X_train, y_train)
             return model, {}
 
-        grid = GridSearchCV(
-            model,
-            params,
-            cv=cv,
-            scoring="neg_mean_squared_error",
-            n_jobs=-1,
-            verbose=0
-        )
+        if strategy == "halving":
+            # Os folds são refeitos a cada subamostra, então não há índices fixos
+            grid = HalvingGridSearchCV(
+                model,
+                params,
+                cv=KFold(n_splits=cv),
+                scoring="neg_mean_squared_error",
+                n_jobs=-1,
+                factor=3,
+                resource="n_samples",
+                min_resources="smallest",
+                random_state=self.random_state,
+                verbose=0
+            )
+        elif strategy == "grid":
+            grid = GridSearchCV(
+                model,
+                params,
+                cv=self._get_cv_splits(cv, len(X_train)),
+                scoring="neg_mean_squared_error",
+                n_jobs=-1,
+                verbose=0
+            )
+        else:
+            raise ValueError(f"Estratégia '{strategy}' inválida. Opções: ['halving', 'grid']")
 
         grid.fit(X_train, y_train)
 
@@ -331,28 +583,53 @@ class ModelTrainer:
         model: Any,
         X_test: pd.DataFrame,
         y_test: pd.Series,
-        model_name: str = "model"
+        model_name: str = "model",
+        n_jobs: Optional[int] = -1
     ) -> Dict[str, float]:
         """
         Avalia um modelo no conjunto de teste.
 
+        A predição roda em blocos de PREDICT_BATCH_SIZE linhas e, nos modelos
+        com n_jobs, usa temporariamente n_jobs threads.
+
         Args:
             model: Modelo treinado
             X_test: Features de teste
             y_test: Target de teste
             model_name: Nome do modelo
+            n_jobs: Threads durante a predição (None = manter o do modelo)
 
         Returns:
             Dicionário com métricas
         """
-        y_pred = model.predict(X_test)
+        y_pred = _predict(model, X_test, self.PREDICT_BATCH_SIZE, n_jobs)
+
+        return self._record_metrics(y_test, y_pred, model_name)
+
+    def _record_metrics(
+        self,
+        y_test: Any,
+        y_pred: np.ndarray,
+        model_name: str
+    ) -> Dict[str, float]:
+        """
+        Calcula e registra as métricas de um conjunto de predições.
 
+        Args:
+            y_test: Target de teste (Series ou array)
+            y_pred: Predições do modelo
+            model_name: Nome do modelo
+
+        Returns:
+            Dicionário com métricas
+        """
+        scores = regression_metrics(y_test, y_pred)
         metrics = {
             "model": model_name,
-            "rmse": np.sqrt(mean_squared_error(y_test, y_pred)),
-            "mae": mean_absolute_error(y_test, y_pred),
-            "r2": r2_score(y_test, y_pred),
-            "mape": mean_absolute_percentage_error(y_test, y_pred) * 100
+            "rmse": scores["rmse"],
+            "mae": scores["mae"],
+            "r2": scores["r2"],
+            "mape": scores["mape"]
         }
 
         self.results[model_name] = metrics
@@ -368,39 +645,64 @@ class ModelTrainer:
     def evaluate_all(
         self,
         X_test: pd.DataFrame,
-        y_test: pd.Series
+        y_test: pd.Series,
+        n_jobs: int = -1,
+        sort: bool = True
     ) -> pd.DataFrame:
         """
         Avalia todos os modelos treinados.
 
+        As predições dos modelos rodam em paralelo em threads (sem copiar os
+        modelos para outros processos); as métricas são calculadas em seguida.
+
         Args:
             X_test: Features de teste
             y_test: Target de teste
+            n_jobs: Threads para as predições (1 = sequencial)
+            sort: Ordenar o resultado por RMSE (False = ordem de treino)
 
         Returns:
             DataFrame com métricas de todos os modelos
         """
-        results = []
+        # Conversões feitas uma única vez e compartilhadas entre os modelos
+        y_true = np.asarray(y_test, dtype=np.float64).ravel()
+        inputs = self._features_by_model(X_test, list(self.trained_models))
+
+        models = list(self.trained_models.values())
+        if n_jobs == 1 or len(models) < 2:
+            predictions = [
+                _predict(model, X, self.PREDICT_BATCH_SIZE, None if n_jobs == 1 else n_jobs)
+                for model, X in zip(models, inputs)
+            ]
+        else:
+            predictions = Parallel(n_jobs=n_jobs, backend="threading")(
+                delayed(_predict)(model, X, self.PREDICT_BATCH_SIZE)
+                for model, X in zip(models, inputs)
+            )
 
-        for name, model in self.trained_models.items():
-            metrics = self.evaluate(model, X_test, y_test, name)
-            results.append(metrics)
+        results = [
+            self._record_metrics(y_true, y_pred, name)
+            for name, y_pred in zip(self.trained_models, predictions)
+        ]
 
         df_results = pd.DataFrame(results)
-        df_results = df_results.sort_values("rmse")
 
-        # Definir melhor modelo
-        self.best_model_name = df_results.iloc[0]["model"]
+        # Definir melhor modelo (menor RMSE, sem depender da ordenação)
+        self.best_model_name = results[int(np.nanargmin(df_results["rmse"].to_numpy()))]["model"]
         self.best_model = self.trained_models[self.best_model_name]
 
         logger.info(f"Melhor modelo: {self.best_model_name}")
 
+        if sort:
+            df_results = df_results.sort_values("rmse")
+
         return df_results
 
     def get_feature_importance(
         self,
         model_name: Optional[str] = None,
-        feature_names: Optional[List[str]] = None
+        feature_names: Optional[List[str]] = None,
+        top_n: Optional[int] = None
     ) -> Optional[pd.DataFrame]:
         """
         Retorna importância das features.
@@ -408,6 +710,7 @@ class ModelTrainer:
         Args:
             model_name: Nome do modelo (None = melhor modelo)
             feature_names: Nomes das features
+            top_n: Retornar apenas as top_n mais importantes (None = todas)
 
         Returns:
             DataFrame com importância das features
@@ -432,14 +735,14 @@ class ModelTrainer:
         if feature_names is None:
             feature_names = [f"feature_{i}" for i in range(len(importance))]
 
-        df_importance = pd.DataFrame({
-            "feature": feature_names[:len(importance)],
-            "importance": importance
-        })
-
-        df_importance = df_importance.sort_values("importance", ascending=False)
+        importance = np.asarray(importance)
+        names = np.asarray(feature_names[:len(importance)], dtype=object)
+        idx = top_n_indices(importance, len(importance) if top_n is None else top_n)
 
-        return df_importance
+        return pd.DataFrame(
+            {"feature": names[idx], "importance": importance[idx]},
+            index=idx
+        )
 
     def save_model(
         self,
@@ -470,8 +773,10 @@ class ModelTrainer:
 
         filepath = Path(filepath)
 
-        with open(filepath, "wb") as f:
-            pickle.dump(model, f)
+        # Protocolo 5 serializa os arrays NumPy sem cópias intermediárias;
+        # lz4 comprime rápido, com zlib como fallback
+        compress = ("lz4", 3) if LZ4_AVAILABLE else ("zlib", 3)
+        joblib.dump(model, filepath, compress=compress, protocol=pickle.HIGHEST_PROTOCOL)
 
         # Salvar metadados
         metadata = {
@@ -498,8 +803,8 @@ class ModelTrainer:
         Returns:
             Modelo carregado
         """
-        with open(filepath, "rb") as f:
-            model = pickle.load(f)
+        # joblib.load também lê arquivos salvos com pickle puro
+        model = joblib.load(filepath)
 
         logger.info(f"Modelo carregado: {filepath}")
 
@@ -2,14 +2,224 @@
 Visualizações para análise de dados agrícolas.
 """
 
-from typing import Optional, List
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, List, Tuple, Union
+import json
+import re
+import unicodedata
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
-import matplotlib.pyplot as plt
-import seaborn as sns
+from loguru import logger
+
+# Numba é opcional: sem ele, todas as agregações usam groupby do pandas
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Bottleneck é opcional: média móvel em C, sem o overhead do rolling do pandas
+try:
+    from bottleneck import move_mean
+    BOTTLENECK_AVAILABLE = True
+except ImportError:
+    BOTTLENECK_AVAILABLE = False
+
+# Abaixo disso o groupby do pandas é rápido o bastante (e não há compilação);
+# vale também para o caminho em np.bincount usado sem Numba
+NUMBA_MIN_ROWS = 100_000
+
+# Blocos de linhas processados em paralelo no kernel de agregação
+_GROUP_BLOCKS = 64
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _group_sum_count(codes: np.ndarray, values: np.ndarray, n_groups: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Soma e contagem de valores não nulos por grupo (accumarray).
+
+        Cada bloco de linhas acumula em sua própria linha dos buffers, então as
+        threads não escrevem na mesma posição; os blocos são somados no final.
+        Códigos negativos (chave nula) e valores NaN são ignorados, como no pandas.
+
+        Returns:
+            Tuple (somas, contagens) por grupo
+        """
+        n = len(codes)
+        n_blocks = min(_GROUP_BLOCKS, max(n, 1))
+        block = (n + n_blocks - 1) // n_blocks
+        sums = np.zeros((n_blocks, n_groups))
+        counts = np.zeros((n_blocks, n_groups), dtype=np.int64)
+
+        for b in prange(n_blocks):
+            for i in range(b * block, min(n, (b + 1) * block)):
+                g = codes[i]
+                v = values[i]
+                if g >= 0 and not np.isnan(v):
+                    sums[b, g] += v
+                    counts[b, g] += 1
+
+        total_sums = np.zeros(n_groups)
+        total_counts = np.zeros(n_groups, dtype=np.int64)
+        for b in range(n_blocks):
+            for g in range(n_groups):
+                total_sums[g] += sums[b, g]
+                total_counts[g] += counts[b, g]
+
+        return total_sums, total_counts
+
+
+def _key_codes(col: pd.Series) -> Tuple[np.ndarray, Any]:
+    """
+    Códigos inteiros ordenados de uma chave de agrupamento, sem hashing quando possível.
+
+    Inteiros (ex: ano) viram deslocamentos a partir do mínimo e categóricas usam
+    os próprios códigos; grupos sem linhas são descartados depois (observed).
+
+    Args:
+        col: Coluna de agrupamento
+
+    Returns:
+        Tuple (códigos, rótulos indexáveis por código)
+    """
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        # O groupby ordena categóricas pela ordem das categorias, igual aos códigos
+        return col.cat.codes.to_numpy(np.int64), col.cat.categories.astype(col.dtype)
+
+    if col.dtype.kind in "iu" and len(col):
+        arr = col.to_numpy().astype(np.int64)
+        low, high = arr.min(), arr.max()
+        if high - low < 10 * len(arr) + 1024:
+            labels = pd.Index(np.arange(low, high + 1).astype(col.dtype))
+            return arr - low, labels
+
+    return pd.factorize(col, sort=True)
+
+
+def _group_reduce(df: pd.DataFrame, keys: List[str], metric: str, how: str) -> Optional[pd.DataFrame]:
+    """
+    Soma ou média de `metric` por `keys` sobre códigos inteiros (accumarray).
+
+    Equivale a df.groupby(keys, observed=True)[metric].<how>().reset_index()
+    para métricas float. Usa o kernel Numba quando disponível e np.bincount
+    caso contrário. Retorna None para frames pequenos ou métricas não float,
+    em que o groupby do pandas é usado.
+
+    Args:
+        df: DataFrame já filtrado
+        keys: Colunas de agrupamento (resultado ordenado por elas)
+        metric: Coluna a agregar
+        how: 'sum' ou 'mean'
+
+    Returns:
+        DataFrame agregado ou None
+    """
+    values = df[metric].to_numpy()
+    if len(df) < NUMBA_MIN_ROWS or values.dtype.kind != "f":
+        return None
+
+    # Códigos combinados (linha-maior) a partir dos códigos ordenados de cada chave
+    codes = np.zeros(len(df), dtype=np.int64)
+    uniques = []
+    for key in keys:
+        key_codes, key_uniques = _key_codes(df[key])
+        codes = np.where((codes < 0) | (key_codes < 0), -1, codes * len(key_uniques) + key_codes)
+        uniques.append(key_uniques)
+
+    n_groups = int(np.prod([len(u) for u in uniques]))
+    values = values.astype(np.float64, copy=False)
+    if NUMBA_AVAILABLE:
+        sums, counts = _group_sum_count(codes, values, n_groups)
+    else:
+        valid = (codes >= 0) & ~np.isnan(values)
+        sums = np.bincount(codes[valid], weights=values[valid], minlength=n_groups)
+        counts = np.bincount(codes[valid], minlength=n_groups)
+
+    # Apenas combinações presentes nos dados (observed=True)
+    present = np.flatnonzero(np.bincount(codes[codes >= 0], minlength=n_groups))
+    if how == "sum":
+        result = sums[present]
+    else:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = sums[present] / counts[present]
+
+    positions = np.unravel_index(present, [len(u) for u in uniques])
+    data = {key: u.take(pos) for key, u, pos in zip(keys, uniques, positions)}
+    data[metric] = result
+    return pd.DataFrame(data)
+
+
+def _histogram_bar(values: np.ndarray, bins: int, **trace_kwargs) -> go.Bar:
+    """
+    Histograma pré-calculado com np.histogram (envia bins, não os dados brutos).
+
+    Args:
+        values: Valores (NaN são ignorados)
+        bins: Número de intervalos
+        **trace_kwargs: Parâmetros extras do go.Bar (name, marker_color...)
+
+    Returns:
+        Trace go.Bar com uma barra por intervalo
+    """
+    values = np.asarray(values, dtype=np.float64)
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=bins)
+    return go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        **trace_kwargs
+    )
+
+
+def _box_traces(values: np.ndarray, name: str, color: str) -> list:
+    """
+    Box plot pré-calculado (quartis e cercas de Tukey) e seus outliers.
+
+    Usa quartis lineares, o mesmo método padrão do Plotly, e envia apenas as
+    estatísticas e os pontos fora das cercas.
+
+    Args:
+        values: Valores (NaN são ignorados)
+        name: Nome da caixa (posição no eixo x)
+        color: Cor da caixa e dos outliers
+
+    Returns:
+        Lista com o go.Box e o go.Scatter dos outliers
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return [go.Box(y=values, name=name, marker_color=color)]
+
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    outliers = values[(values < inside.min()) | (values > inside.max())]
+
+    box = go.Box(
+        x=[name],
+        q1=[q1],
+        median=[median],
+        q3=[q3],
+        lowerfence=[inside.min()],
+        upperfence=[inside.max()],
+        name=name,
+        marker_color=color
+    )
+    points = go.Scatter(
+        x=np.full(len(outliers), name, dtype=object),
+        y=outliers,
+        mode="markers",
+        name=name,
+        marker=dict(color=color)
+    )
+    return [box, points]
 
 
 class AgricultureVisualizer:
@@ -35,10 +245,253 @@ class AgricultureVisualizer:
         "Mandioca": "#D2691E"
     }
 
-    def __init__(self):
-        """Inicializa o visualizador."""
+    # Cor dos gráficos de série única e das culturas fora da paleta
+    DEFAULT_COLOR = "#636efa"
+    FALLBACK_COLORS = px.colors.qualitative.Plotly
+
+    # Métricas de produção (precisão de float32 basta para visualização)
+    METRIC_COLUMNS = (
+        "area_plantada_ha",
+        "area_colhida_ha",
+        "producao_ton",
+        "rendimento_kg_ha",
+        "valor_producao_mil_reais"
+    )
+
+    def __init__(self, cache_size: int = 128):
+        """
+        Inicializa o visualizador.
+
+        Args:
+            cache_size: Máximo de agregações mantidas em memória (0 = sem cache)
+        """
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[Hashable, ...], Tuple[pd.DataFrame, Any]]" = OrderedDict()
+
+    @staticmethod
+    def enable_matplotlib_style():
+        """
+        Aplica o estilo padrão do projeto ao matplotlib.
+
+        Os gráficos deste módulo são Plotly; chame apenas se for gerar figuras
+        matplotlib junto com eles (o import fica restrito a esse caso).
+        """
+        import matplotlib.pyplot as plt
         plt.style.use("seaborn-v0_8-whitegrid")
 
+    @staticmethod
+    def prepare(df: pd.DataFrame, float32: bool = True) -> pd.DataFrame:
+        """
+        Prepara o DataFrame para os gráficos: cultura/estado como category, ano
+        no menor inteiro que comporte os valores (int16 para anos) e métricas
+        de produção em float32.
+
+        Os métodos plot_* aceitam o DataFrame original, mas com o frame
+        preparado os groupbys usam códigos inteiros em vez de hashear strings
+        e cada filtro/agregação move metade dos bytes nas métricas.
+
+        Args:
+            df: DataFrame com dados
+            float32: Converter as METRIC_COLUMNS float64 para float32
+
+        Returns:
+            Novo DataFrame com os tipos convertidos
+        """
+        conversions = {
+            col: df[col].astype("category")
+            for col in ("cultura", "estado")
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype)
+        }
+        if "ano" in df.columns:
+            # Com nulos o ano continua float (downcast inteiro não se aplica)
+            conversions["ano"] = pd.to_numeric(df["ano"], downcast="integer")
+        if float32:
+            conversions.update({
+                col: df[col].astype(np.float32)
+                for col in AgricultureVisualizer.METRIC_COLUMNS
+                if col in df.columns and df[col].dtype == np.float64
+            })
+
+        return df.assign(**conversions)
+
+    def _culture_colors(self, culturas: List[str]) -> List[str]:
+        """
+        Cor de cada cultura: COLORS_CULTURAS ou, para as demais, a sequência
+        padrão do Plotly na ordem em que aparecem (como o color_discrete_map do px).
+
+        Args:
+            culturas: Nomes das culturas
+
+        Returns:
+            Lista de cores na mesma ordem
+        """
+        extras = {}
+        for cultura in culturas:
+            if cultura not in self.COLORS_CULTURAS and cultura not in extras:
+                extras[cultura] = self.FALLBACK_COLORS[len(extras) % len(self.FALLBACK_COLORS)]
+        return [self.COLORS_CULTURAS.get(cultura) or extras[cultura] for cultura in culturas]
+
+    def clear_cache(self):
+        """Descarta as agregações mantidas em memória (ex: após alterar o DataFrame)."""
+        self._cache.clear()
+
+    def _cached(self, df: pd.DataFrame, key: Tuple[Hashable, ...], compute: Callable[[], Any]) -> Any:
+        """
+        Retorna a agregação em cache para (df, key) ou calcula e armazena.
+
+        A chave usa id(df); a entrada guarda a referência ao DataFrame, então o
+        id não é reaproveitado por outro objeto enquanto estiver no cache.
+        Alterações in-place no DataFrame exigem clear_cache().
+
+        Args:
+            df: DataFrame de origem
+            key: Tipo de agregação e seus parâmetros
+            compute: Função que calcula a agregação
+
+        Returns:
+            Resultado da agregação (não deve ser modificado)
+        """
+        if self.cache_size <= 0:
+            return compute()
+
+        full_key = (id(df),) + key
+        entry = self._cache.get(full_key)
+        if entry is not None and entry[0] is df:
+            self._cache.move_to_end(full_key)
+            return entry[1]
+
+        result = compute()
+        self._cache[full_key] = (df, result)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _mask(
+        df: pd.DataFrame,
+        cultura: Optional[str] = None,
+        estado: Optional[str] = None,
+        ano: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Máscara booleana única com os filtros informados (None = sem filtro).
+
+        Args:
+            df: DataFrame
+            cultura: Cultura
+            estado: Estado
+            ano: Ano
+
+        Returns:
+            Array booleano com len(df) posições
+        """
+        mask = np.ones(len(df), dtype=bool)
+        if cultura:
+            mask &= (df["cultura"] == cultura).to_numpy()
+        if estado:
+            mask &= (df["estado"] == estado).to_numpy()
+        if ano:
+            mask &= (df["ano"] == ano).to_numpy()
+        return mask
+
+    def _agg_by_year(
+        self,
+        df: pd.DataFrame,
+        cultura: Optional[str],
+        estado: Optional[str],
+        metric: str
+    ) -> pd.DataFrame:
+        """Soma da métrica por ano, com filtros opcionais de cultura/estado."""
+        def compute():
+            # Sem cópia do frame: uma máscara e só as colunas usadas
+            df_plot = df.loc[self._mask(df, cultura, estado), ["ano", metric]]
+
+            result = _group_reduce(df_plot, ["ano"], metric, "sum")
+            if result is not None:
+                return result
+            return df_plot.groupby("ano", observed=True)[metric].sum().reset_index()
+
+        return self._cached(df, ("ano_sum", cultura, estado, metric), compute)
+
+    def _agg_by_culture(self, df: pd.DataFrame, ano: int, metric: str) -> pd.DataFrame:
+        """Soma da métrica por cultura em um ano."""
+        def compute():
+            df_ano = df.loc[self._mask(df, ano=ano), ["cultura", metric]]
+            return df_ano.groupby("cultura", observed=True, sort=False)[metric].sum().reset_index()
+
+        return self._cached(df, ("cultura_sum", ano, metric), compute)
+
+    def _agg_by_state(self, df: pd.DataFrame, cultura: str, ano: int, metric: str) -> pd.DataFrame:
+        """Média da métrica por estado para uma cultura e um ano."""
+        def compute():
+            df_filtered = df.loc[self._mask(df, cultura, ano=ano), ["estado", metric]]
+
+            result = _group_reduce(df_filtered, ["estado"], metric, "mean")
+            if result is not None:
+                return result
+            return df_filtered.groupby("estado", observed=True, sort=False)[metric].mean().reset_index()
+
+        return self._cached(df, ("estado_mean", cultura, ano, metric), compute)
+
+    def _agg_by_year_culture(self, df: pd.DataFrame, culturas: Tuple[str, ...], metric: str) -> pd.DataFrame:
+        """Média da métrica por ano e cultura, para as culturas informadas."""
+        def compute():
+            mask = df["cultura"].isin(culturas).to_numpy()
+            df_filtered = df.loc[mask, ["ano", "cultura", metric]]
+
+            result = _group_reduce(df_filtered, ["ano", "cultura"], metric, "mean")
+            if result is not None:
+                return result
+            return df_filtered.groupby(["ano", "cultura"], observed=True)[metric].mean().reset_index()
+
+        return self._cached(df, ("ano_cultura_mean", culturas, metric), compute)
+
+    def _pivot_state_year(self, df: pd.DataFrame, cultura: str, metric: str) -> pd.DataFrame:
+        """Matriz estado x ano com a média da métrica, ordenada pela média do estado."""
+        def compute():
+            df_filtered = df.loc[self._mask(df, cultura), ["estado", "ano", metric]]
+
+            # Pivot por códigos inteiros: soma e contagem em uma passada (bincount)
+            est_codes, estados = _key_codes(df_filtered["estado"])
+            ano_codes, anos = _key_codes(df_filtered["ano"])
+            values = df_filtered[metric].to_numpy(dtype=np.float64)
+
+            valid = (est_codes >= 0) & (ano_codes >= 0) & ~np.isnan(values)
+            cells = est_codes[valid] * len(anos) + ano_codes[valid]
+            shape = (len(estados), len(anos))
+            sums = np.bincount(cells, weights=values[valid], minlength=shape[0] * shape[1]).reshape(shape)
+            counts = np.bincount(cells, minlength=shape[0] * shape[1]).reshape(shape)
+
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = sums / counts
+
+            # Como pivot_table: apenas estados/anos com algum valor
+            rows = np.flatnonzero(counts.any(axis=1))
+            cols = np.flatnonzero(counts.any(axis=0))
+            pivot = pd.DataFrame(
+                means[np.ix_(rows, cols)],
+                index=pd.Index(np.asarray(estados.take(rows)), name="estado"),
+                columns=pd.Index(np.asarray(anos.take(cols)), name="ano")
+            )
+
+            # Ordenar por média
+            return pivot.loc[pivot.mean(axis=1).sort_values(ascending=False).index]
+
+        return self._cached(df, ("estado_ano_pivot", cultura, metric), compute)
+
+    def _filter_culture_state(
+        self,
+        df: pd.DataFrame,
+        cultura: str,
+        estado: Optional[str] = None,
+        ano: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Linhas de uma cultura, com filtros opcionais de estado e ano."""
+        def compute():
+            return df[self._mask(df, cultura, estado, ano)]
+
+        return self._cached(df, ("filtro", cultura, estado, ano), compute)
+
     def plot_producao_temporal(
         self,
         df: pd.DataFrame,
@@ -58,15 +511,8 @@ class AgricultureVisualizer:
         Returns:
             Figura Plotly
         """
-        df_plot = df.copy()
-
-        if cultura:
-            df_plot = df_plot[df_plot["cultura"] == cultura]
-        if estado:
-            df_plot = df_plot[df_plot["estado"] == estado]
-
         # Agregar por ano
-        agg_df = df_plot.groupby("ano")[metric].sum().reset_index()
+        agg_df = self._agg_by_year(df, cultura, estado, metric)
 
         titulo = f"Evolução da {metric.replace('_', ' ').title()}"
         if cultura:
@@ -74,18 +520,21 @@ class AgricultureVisualizer:
         if estado:
             titulo += f" ({estado})"
 
-        fig = px.area(
-            agg_df,
-            x="ano",
-            y=metric,
-            title=titulo,
-            labels={"ano": "Ano", metric: metric.replace("_", " ").title()}
-        )
+        label = metric.replace("_", " ").title()
+
+        # Trace montado direto dos arrays (px.area copiaria e reagruparia o frame)
+        fig = go.Figure(go.Scatter(
+            x=agg_df["ano"].to_numpy(),
+            y=agg_df[metric].to_numpy(),
+            mode="lines",
+            fill="tozeroy",
+            line=dict(color=self.DEFAULT_COLOR, width=2),
+            fillcolor="rgba(46, 139, 87, 0.3)",
+            hovertemplate=f"Ano=%{{x}}<br>{label}=%{{y}}<extra></extra>",
+            showlegend=False
+        ))
 
-        fig.update_traces(
-            line=dict(width=2),
-            fillcolor="rgba(46, 139, 87, 0.3)"
-        )
+        fig.update_layout(title=titulo, xaxis_title="Ano", yaxis_title=label)
 
         return fig
 
@@ -108,22 +557,23 @@ class AgricultureVisualizer:
         Returns:
             Figura Plotly
         """
-        df_ano = df[df["ano"] == ano]
+        agg_df = self._agg_by_culture(df, ano, metric).nlargest(top_n, metric)
 
-        agg_df = df_ano.groupby("cultura")[metric].sum().reset_index()
-        agg_df = agg_df.nlargest(top_n, metric)
+        label = metric.replace("_", " ").title()
+        culturas = agg_df["cultura"].astype(str).tolist()
 
-        fig = px.bar(
-            agg_df,
-            x="cultura",
-            y=metric,
-            title=f"Top {top_n} Culturas por {metric.replace('_', ' ').title()} ({ano})",
-            labels={"cultura": "Cultura", metric: metric.replace("_", " ").title()},
-            color="cultura",
-            color_discrete_map=self.COLORS_CULTURAS
-        )
+        # Uma única barra com a cor de cada cultura (px.bar cria um trace por cor)
+        fig = go.Figure(go.Bar(
+            x=culturas,
+            y=agg_df[metric].to_numpy(),
+            marker_color=self._culture_colors(culturas),
+            hovertemplate=f"Cultura=%{{x}}<br>{label}=%{{y}}<extra></extra>"
+        ))
 
         fig.update_layout(
+            title=f"Top {top_n} Culturas por {label} ({ano})",
+            xaxis_title="Cultura",
+            yaxis_title=label,
             xaxis_tickangle=-45,
             showlegend=False
         )
@@ -149,23 +599,26 @@ class AgricultureVisualizer:
         Returns:
             Figura Plotly
         """
-        df_filtered = df[(df["cultura"] == cultura) & (df["ano"] == ano)]
+        agg_df = self._agg_by_state(df, cultura, ano, metric).sort_values(metric, ascending=True)
 
-        agg_df = df_filtered.groupby("estado")[metric].mean().reset_index()
-        agg_df = agg_df.sort_values(metric, ascending=True)
+        label = metric.replace("_", " ").title()
+        valores = agg_df[metric].to_numpy()
 
-        fig = px.bar(
-            agg_df,
-            x=metric,
-            y="estado",
+        fig = go.Figure(go.Bar(
+            x=valores,
+            y=agg_df["estado"].astype(str).tolist(),
             orientation="h",
-            title=f"{metric.replace('_', ' ').title()} por Estado - {cultura} ({ano})",
-            labels={"estado": "Estado", metric: metric.replace("_", " ").title()},
-            color=metric,
-            color_continuous_scale="Viridis"
-        )
+            marker=dict(color=valores, coloraxis="coloraxis"),
+            hovertemplate=f"{label}=%{{x}}<br>Estado=%{{y}}<extra></extra>"
+        ))
 
-        fig.update_layout(height=max(400, len(agg_df) * 25))
+        fig.update_layout(
+            title=f"{label} por Estado - {cultura} ({ano})",
+            xaxis_title=label,
+            yaxis_title="Estado",
+            coloraxis=dict(colorscale="Viridis", colorbar_title=label),
+            height=max(400, len(agg_df) * 25)
+        )
 
         return fig
 
@@ -186,9 +639,7 @@ class AgricultureVisualizer:
         Returns:
             Figura Plotly
         """
-        df_filtered = df[df["cultura"].isin(culturas)]
-
-        agg_df = df_filtered.groupby(["ano", "cultura"])[metric].mean().reset_index()
+        agg_df = self._agg_by_year_culture(df, tuple(culturas), metric)
 
         fig = px.line(
             agg_df,
@@ -222,17 +673,7 @@ class AgricultureVisualizer:
         Returns:
             Figura Plotly
         """
-        df_filtered = df[df["cultura"] == cultura]
-
-        pivot = df_filtered.pivot_table(
-            values=metric,
-            index="estado",
-            columns="ano",
-            aggfunc="mean"
-        )
-
-        # Ordenar por média
-        pivot = pivot.loc[pivot.mean(axis=1).sort_values(ascending=False).index]
+        pivot = self._pivot_state_year(df, cultura, metric)
 
         fig = px.imshow(
             pivot,
@@ -263,9 +704,7 @@ class AgricultureVisualizer:
         Returns:
             Figura Plotly
         """
-        df_filtered = df[df["cultura"] == cultura]
-        if ano:
-            df_filtered = df_filtered[df_filtered["ano"] == ano]
+        df_filtered = self._filter_culture_state(df, cultura, ano=ano)
 
         titulo = f"Distribuição do Rendimento - {cultura}"
         if ano:
@@ -273,27 +712,18 @@ class AgricultureVisualizer:
 
         fig = make_subplots(rows=1, cols=2, subplot_titles=("Histograma", "Box Plot"))
 
+        # Estatísticas calculadas aqui; o Plotly recebe só bins e quartis
+        rendimento = df_filtered["rendimento_kg_ha"].to_numpy()
+
         # Histograma
         fig.add_trace(
-            go.Histogram(
-                x=df_filtered["rendimento_kg_ha"],
-                nbinsx=30,
-                name="Frequência",
-                marker_color="steelblue"
-            ),
+            _histogram_bar(rendimento, 30, name="Frequência", marker_color="steelblue"),
             row=1, col=1
         )
 
         # Box plot
-        fig.add_trace(
-            go.Box(
-                y=df_filtered["rendimento_kg_ha"],
-                name="Distribuição",
-                marker_color="steelblue",
-                boxpoints="outliers"
-            ),
-            row=1, col=2
-        )
+        for trace in _box_traces(rendimento, "Distribuição", "steelblue"):
+            fig.add_trace(trace, row=1, col=2)
 
         fig.update_layout(
             title=titulo,
@@ -319,9 +749,9 @@ class AgricultureVisualizer:
             Figura Plotly
         """
         if columns is None:
-            columns = df.select_dtypes(include=[np.number]).columns.tolist()
+            columns = self._numeric_columns(df)
 
-        corr = df[columns].corr()
+        corr = self._correlation(df, columns)
 
         fig = px.imshow(
             corr,
@@ -339,23 +769,87 @@ class AgricultureVisualizer:
 
         return fig
 
+    def _numeric_columns(self, df: pd.DataFrame) -> List[str]:
+        """
+        Colunas numéricas do DataFrame, guardadas no cache de agregações.
+
+        Args:
+            df: DataFrame
+
+        Returns:
+            Lista com os nomes das colunas numéricas (não deve ser modificada)
+        """
+        return self._cached(
+            df, ("numeric_columns",),
+            lambda: df.select_dtypes(include=[np.number]).columns.tolist()
+        )
+
+    @staticmethod
+    def _correlation(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        """
+        Matriz de correlação de Pearson em float32 (uma única GEMM).
+
+        Colunas com nulos precisam da correlação par a par do pandas
+        (observações completas por par), então usam df.corr().
+
+        Args:
+            df: DataFrame
+            columns: Colunas numéricas
+
+        Returns:
+            DataFrame com a matriz de correlação
+        """
+        mat = df[columns].to_numpy(dtype=np.float32)
+        if len(mat) < 2 or np.isnan(mat).any():
+            return df[columns].corr()
+
+        mat -= mat.mean(axis=0, dtype=np.float64).astype(np.float32)
+        norms = np.sqrt(np.einsum("ij,ij->j", mat, mat))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mat /= norms
+            corr = np.clip(mat.T @ mat, -1.0, 1.0).astype(np.float64)
+
+        # Colunas constantes ficam NaN (como no pandas); as demais têm diagonal 1
+        constant = norms == 0
+        corr[constant, :] = np.nan
+        corr[:, constant] = np.nan
+        corr[np.diag_indices_from(corr)] = np.where(constant, np.nan, 1.0)
+
+        return pd.DataFrame(corr, index=columns, columns=columns)
+
     def plot_scatter_matrix(
         self,
         df: pd.DataFrame,
         columns: List[str],
-        color_by: Optional[str] = None
+        color_by: Optional[str] = None,
+        max_points: Optional[int] = 5000
     ) -> go.Figure:
         """
         Matriz de dispersão.
 
+        Acima de max_points linhas, desenha uma amostra aleatória (estratificada
+        por color_by, mantendo a proporção de cada grupo): o navegador não
+        consegue renderizar milhões de pontos em K² painéis.
+
         Args:
             df: DataFrame
             columns: Colunas para incluir
             color_by: Coluna para colorir
+            max_points: Máximo de linhas desenhadas (None = todas)
 
         Returns:
             Figura Plotly
         """
+        if max_points is not None and len(df) > max_points:
+            used = list(dict.fromkeys(columns + ([color_by] if color_by else [])))
+            df_used = df[used]
+            if color_by:
+                df = df_used.groupby(color_by, observed=True, sort=False, group_keys=False).sample(
+                    frac=max_points / len(df), random_state=0
+                )
+            else:
+                df = df_used.sample(max_points, random_state=0)
+
         fig = px.scatter_matrix(
             df,
             dimensions=columns,
@@ -388,7 +882,7 @@ class AgricultureVisualizer:
         Returns:
             Figura Plotly
         """
-        df_filtered = df[(df["cultura"] == cultura) & (df["estado"] == estado)]
+        df_filtered = self._filter_culture_state(df, cultura, estado)
 
         fig = make_subplots(
             rows=2, cols=2,
@@ -400,16 +894,33 @@ class AgricultureVisualizer:
             ),
             specs=[
                 [{"type": "scatter"}, {"type": "scatter"}],
-                [{"type": "histogram"}, {"type": "scatter"}]
+                [{"type": "bar"}, {"type": "scatter"}]
             ]
         )
 
+        # Colunas extraídas uma vez e reaproveitadas pelos quatro gráficos
+        rendimento = df_filtered["rendimento_kg_ha"].to_numpy(np.float64)
+        anos = df_filtered["ano"]
+
+        def by_year():
+            # Média anual com bincount sobre os códigos do ano (NaN ignorados)
+            codes, labels = _key_codes(anos)
+            n_groups = len(labels)
+            has_key = codes >= 0
+            valid = has_key & ~np.isnan(rendimento)
+            sums = np.bincount(codes[valid], weights=rendimento[valid], minlength=n_groups)
+            counts = np.bincount(codes[valid], minlength=n_groups)
+            present = np.flatnonzero(np.bincount(codes[has_key], minlength=n_groups))
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return np.asarray(labels.take(present)), sums[present] / counts[present]
+
+        anos_x, media_ano = self._cached(df, ("dashboard_ano", cultura, estado), by_year)
+
         # 1. Evolução temporal
-        agg_ano = df_filtered.groupby("ano")["rendimento_kg_ha"].mean().reset_index()
         fig.add_trace(
             go.Scatter(
-                x=agg_ano["ano"],
-                y=agg_ano["rendimento_kg_ha"],
+                x=anos_x,
+                y=media_ano,
                 mode="lines+markers",
                 name="Rendimento",
                 line=dict(color="green")
@@ -420,13 +931,13 @@ class AgricultureVisualizer:
         # 2. Área vs Produção
         fig.add_trace(
             go.Scatter(
-                x=df_filtered["area_plantada_ha"],
-                y=df_filtered["producao_ton"],
+                x=df_filtered["area_plantada_ha"].to_numpy(),
+                y=df_filtered["producao_ton"].to_numpy(),
                 mode="markers",
                 name="Área x Produção",
                 marker=dict(
                     size=8,
-                    color=df_filtered["ano"],
+                    color=anos.to_numpy(),
                     colorscale="Viridis",
                     showscale=True
                 )
@@ -436,21 +947,20 @@ class AgricultureVisualizer:
 
         # 3. Histograma
         fig.add_trace(
-            go.Histogram(
-                x=df_filtered["rendimento_kg_ha"],
-                nbinsx=20,
-                name="Frequência",
-                marker_color="steelblue"
-            ),
+            _histogram_bar(rendimento, 20, name="Frequência", marker_color="steelblue"),
             row=2, col=1
         )
 
         # 4. Tendência
-        agg_ano["ma3"] = agg_ano["rendimento_kg_ha"].rolling(3).mean()
+        if BOTTLENECK_AVAILABLE:
+            # min_count=3 mantém a semântica de rolling(3): NaN até a janela completar
+            ma3 = move_mean(media_ano, window=3, min_count=3)
+        else:
+            ma3 = pd.Series(media_ano).rolling(3).mean().to_numpy()
         fig.add_trace(
             go.Scatter(
-                x=agg_ano["ano"],
-                y=agg_ano["rendimento_kg_ha"],
+                x=anos_x,
+                y=media_ano,
                 mode="markers",
                 name="Real",
                 marker=dict(color="blue")
@@ -459,8 +969,8 @@ class AgricultureVisualizer:
         )
         fig.add_trace(
             go.Scatter(
-                x=agg_ano["ano"],
-                y=agg_ano["ma3"],
+                x=anos_x,
+                y=ma3,
                 mode="lines",
                 name="MA(3)",
                 line=dict(color="red", width=2)
@@ -475,3 +985,122 @@ class AgricultureVisualizer:
         )
 
         return fig
+
+    @staticmethod
+    def figure_key(plot: str, **params) -> str:
+        """
+        Chave determinística de uma figura materializada.
+
+        Parâmetros None são omitidos; os demais entram em ordem alfabética,
+        sem acentos e em minúsculas, para servir de nome de arquivo.
+
+        Args:
+            plot: Nome do gráfico (método plot_* sem o prefixo)
+            **params: Parâmetros usados para gerar a figura
+
+        Returns:
+            Chave da figura (ex: "producao_temporal__cultura=soja-em-grao__metric=producao_ton")
+        """
+        def slug(value: Any) -> str:
+            text = unicodedata.normalize("NFKD", str(value)).encode("ascii", "ignore").decode()
+            return re.sub(r"[^a-z0-9_]+", "-", text.lower()).strip("-")
+
+        parts = [plot] + [f"{name}={slug(value)}" for name, value in sorted(params.items()) if value is not None]
+        return "__".join(parts)
+
+    def materialize(
+        self,
+        df: pd.DataFrame,
+        out_dir: Union[str, Path],
+        metrics: Iterable[str] = ("producao_ton", "rendimento_kg_ha"),
+        anos: Optional[List[int]] = None,
+        html: bool = True
+    ) -> Dict[str, Path]:
+        """
+        Gera as figuras em lote e salva em disco (JSON e, opcionalmente, HTML).
+
+        Para dados que mudam pouco (atualização anual), uma aplicação pode
+        servir as figuras salvas com load() em vez de refazer os groupbys a
+        cada requisição. Cobre a grade (cultura, estado, métrica) presente no
+        DataFrame:
+        - por cultura: série temporal, heatmap estado x ano e distribuição
+        - por (cultura, estado): série temporal e dashboard resumo
+        - por ano: comparação de culturas e, por cultura, de estados
+
+        Um índice (index.json) mapeia cada chave aos parâmetros usados.
+
+        Args:
+            df: DataFrame com dados (de preferência já passado por prepare())
+            out_dir: Diretório de saída
+            metrics: Métricas das séries temporais, comparações e heatmaps
+            anos: Anos das comparações (None = último ano disponível)
+            html: Salvar também o HTML de cada figura
+
+        Returns:
+            Dicionário chave -> caminho do JSON salvo
+        """
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        metrics = list(metrics)
+        pares = df[["cultura", "estado"]].dropna().drop_duplicates()
+        pares = sorted(pares.itertuples(index=False, name=None), key=lambda p: (str(p[0]), str(p[1])))
+        culturas = sorted({cultura for cultura, _ in pares}, key=str)
+        if anos is None:
+            anos = [] if df["ano"].isna().all() else [int(df["ano"].max())]
+
+        jobs = []
+        for cultura in culturas:
+            jobs.append(("distribuicao_rendimento", dict(cultura=cultura)))
+            for metric in metrics:
+                jobs.append(("producao_temporal", dict(cultura=cultura, metric=metric)))
+                jobs.append(("heatmap_estado_ano", dict(cultura=cultura, metric=metric)))
+        for cultura, estado in pares:
+            jobs.append(("dashboard_summary", dict(cultura=cultura, estado=estado)))
+            for metric in metrics:
+                jobs.append(("producao_temporal", dict(cultura=cultura, estado=estado, metric=metric)))
+        for ano in anos:
+            for metric in metrics:
+                jobs.append(("comparacao_culturas", dict(ano=ano, metric=metric)))
+                for cultura in culturas:
+                    jobs.append(("comparacao_estados", dict(cultura=cultura, ano=ano, metric=metric)))
+
+        paths = {}
+        index = {}
+        for plot, params in jobs:
+            key = self.figure_key(plot, **params)
+            method = self.create_dashboard_summary if plot == "dashboard_summary" else getattr(self, f"plot_{plot}")
+            try:
+                fig = method(df, **params)
+            except Exception as e:
+                logger.warning(f"Erro ao gerar {key}: {str(e)}")
+                continue
+
+            json_path = out_dir / f"{key}.json"
+            json_path.write_text(fig.to_json(), encoding="utf-8")
+            if html:
+                fig.write_html(out_dir / f"{key}.html", include_plotlyjs="cdn")
+
+            paths[key] = json_path
+            index[key] = {"plot": plot, **{name: str(value) for name, value in params.items()}}
+
+        with open(out_dir / "index.json", "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2, ensure_ascii=False)
+
+        logger.info(f"{len(paths)} figuras salvas em {out_dir}")
+        return paths
+
+    @staticmethod
+    def load(key: str, out_dir: Union[str, Path]) -> go.Figure:
+        """
+        Carrega uma figura salva por materialize().
+
+        Args:
+            key: Chave da figura (ver figure_key)
+            out_dir: Diretório usado em materialize()
+
+        Returns:
+            Figura Plotly
+        """
+        json_path = Path(out_dir) / f"{key}.json"
+        return pio.from_json(json_path.read_text(encoding="utf-8"))
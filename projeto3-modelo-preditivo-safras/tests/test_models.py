@@ -13,23 +13,27 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.models.trainer import ModelTrainer
 from src.models.evaluator import ModelEvaluator
+from src.features.feature_engineer import FeatureEngineer, OutlierClipTransformer
+from src.features.multicollinearity import VIFAnalyzer
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_data():
     """Gera dados de exemplo para testes."""
+    # Dimensionado para smoke tests (as asserções checam formato e propriedades
+    # das métricas, não a qualidade do modelo)
     X, y = make_regression(
-        n_samples=500,
-        n_features=10,
+        n_samples=100,
+        n_features=5,
         noise=10,
         random_state=42
     )
-    X = pd.DataFrame(X, columns=[f"feature_{i}" for i in range(10)])
+    X = pd.DataFrame(X, columns=[f"feature_{i}" for i in range(5)])
     y = pd.Series(y, name="target")
     return X, y
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def train_test_split_data(sample_data):
     """Divide dados em treino e teste."""
     from sklearn.model_selection import train_test_split
@@ -37,6 +41,24 @@ def train_test_split_data(sample_data):
     return train_test_split(X, y, test_size=0.2, random_state=42)
 
 
+@pytest.fixture(scope="session")
+def rf_trainer(train_test_split_data):
+    """Trainer com Random Forest treinado (uma vez por sessão)."""
+    X_train, X_test, y_train, y_test = train_test_split_data
+    trainer = ModelTrainer()
+    trainer.train_model(X_train, y_train, "random_forest")
+    return trainer
+
+
+@pytest.fixture(scope="session")
+def ridge_trainer(train_test_split_data):
+    """Trainer com Ridge treinado (uma vez por sessão)."""
+    X_train, X_test, y_train, y_test = train_test_split_data
+    trainer = ModelTrainer()
+    trainer.train_model(X_train, y_train, "ridge")
+    return trainer
+
+
 class TestModelTrainer:
     """Testes para ModelTrainer."""
 
@@ -78,13 +100,12 @@ class TestModelTrainer:
 
         assert len(trainer.trained_models) == 2
 
-    def test_evaluate(self, train_test_split_data):
+    def test_evaluate(self, train_test_split_data, ridge_trainer):
         """Testa avaliação de modelo."""
         X_train, X_test, y_train, y_test = train_test_split_data
-        trainer = ModelTrainer()
 
-        model = trainer.train_model(X_train, y_train, "linear_regression")
-        metrics = trainer.evaluate(model, X_test, y_test, "linear_regression")
+        model = ridge_trainer.trained_models["ridge"]
+        metrics = ridge_trainer.evaluate(model, X_test, y_test, "ridge")
 
         assert "rmse" in metrics
         assert "mae" in metrics
@@ -153,13 +174,11 @@ class TestModelEvaluator:
 class TestFeatureImportance:
     """Testes para feature importance."""
 
-    def test_feature_importance_random_forest(self, train_test_split_data):
+    def test_feature_importance_random_forest(self, train_test_split_data, rf_trainer):
         """Testa extração de feature importance."""
         X_train, X_test, y_train, y_test = train_test_split_data
-        trainer = ModelTrainer()
 
-        trainer.train_model(X_train, y_train, "random_forest")
-        importance = trainer.get_feature_importance(
+        importance = rf_trainer.get_feature_importance(
             "random_forest",
             feature_names=X_train.columns.tolist()
         )
@@ -169,13 +188,11 @@ class TestFeatureImportance:
         assert "importance" in importance.columns
         assert len(importance) == X_train.shape[1]
 
-    def test_feature_importance_linear(self, train_test_split_data):
+    def test_feature_importance_linear(self, train_test_split_data, ridge_trainer):
         """Testa coeficientes de modelo linear."""
         X_train, X_test, y_train, y_test = train_test_split_data
-        trainer = ModelTrainer()
 
-        trainer.train_model(X_train, y_train, "ridge")
-        importance = trainer.get_feature_importance(
+        importance = ridge_trainer.get_feature_importance(
             "ridge",
             feature_names=X_train.columns.tolist()
         )
@@ -184,5 +201,76 @@ class TestFeatureImportance:
         assert importance is not None
 
 
+
+@pytest.fixture(scope="session")
+def outlier_data():
+    """Dados com colunas inteiras e float contendo outliers."""
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        "ano": np.arange(2000, 2020).repeat(5),
+        "area_plantada": np.r_[rng.integers(100, 200, 99), 50_000],
+        "produtividade": np.r_[rng.normal(3.0, 0.5, 99), 40.0],
+    })
+
+
+class TestOutlierHandling:
+    """Testes para tratamento de outliers."""
+
+    def test_handle_outliers_preserves_dtypes(self, outlier_data):
+        """Testa que colunas inteiras sem clip fracionário continuam int64."""
+        result = FeatureEngineer().handle_outliers(outlier_data)
+
+        assert result["ano"].dtype == np.int64
+        assert result["produtividade"].dtype == np.float64
+        assert result["produtividade"].max() < 40.0
+
+    def test_handle_outliers_matches_series_clip(self, outlier_data):
+        """Testa que o resultado (valores e dtypes) equivale ao Series.clip."""
+        expected = outlier_data.copy()
+        for col in expected.columns:
+            mean, std = expected[col].mean(), expected[col].std()
+            expected[col] = expected[col].clip(mean - 3 * std, mean + 3 * std)
+
+        result = FeatureEngineer().handle_outliers(outlier_data)
+
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_clip_transformer_preserves_dtypes(self, outlier_data):
+        """Testa que o transformador mantém os dtypes das colunas não clipadas."""
+        result = OutlierClipTransformer().fit(outlier_data).transform(outlier_data)
+
+        assert result["ano"].dtype == np.int64
+        assert result["produtividade"].dtype == np.float64
+        assert result["produtividade"].max() < 40.0
+
+
+
+class TestVIFAnalyzer:
+    """Testes para análise de multicolinearidade."""
+
+    def test_report_after_removal(self):
+        """Testa que o relatório descreve as features restantes após a remoção."""
+        rng = np.random.default_rng(42)
+        x1 = rng.normal(size=500)
+        x4 = rng.normal(size=500)
+        df = pd.DataFrame({
+            "f1": x1,
+            "f2": x1 + rng.normal(size=500) * 0.1,
+            "f3": 2 * x1 + rng.normal(size=500) * 0.1,
+            "f4": x4,
+            "f5": x4 + rng.normal(size=500) * 0.5,
+        })
+
+        analyzer = VIFAnalyzer(threshold=10.0, warning_threshold=5.0)
+        df_clean, removed = analyzer.remove_high_vif_features(df)
+        report = analyzer.generate_report()
+
+        assert report["total_features"] == len(df_clean.columns) == 3
+        assert set(analyzer.vif_results["feature"]) == set(df_clean.columns)
+        assert report["high_vif_count"] == 0
+        assert report["features_to_remove"] == []
+        assert len(removed) == 2
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
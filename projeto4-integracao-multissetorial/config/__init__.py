@@ -1,4 +1,41 @@
-"""Módulo de configurações."""
-from .settings import settings, get_settings, FONTES_DADOS, MUNICIPIOS_PIAUI
+"""Módulo de configurações.
 
-__all__ = ["settings", "get_settings", "FONTES_DADOS", "MUNICIPIOS_PIAUI"]
+Os objetos de config.settings são carregados sob demanda (PEP 562): importar
+o pacote não instancia Settings nem lê variáveis de ambiente até o primeiro
+acesso a um dos nomes exportados.
+"""
+import sys
+import types
+from importlib import import_module
+
+_EXPORTS = ("settings", "get_settings", "FONTES_DADOS", "MUNICIPIOS_PIAUI")
+
+__all__ = list(_EXPORTS)
+
+
+class _ConfigModule(types.ModuleType):
+    """Módulo do pacote que preserva config.settings como o objeto Settings."""
+
+    def __setattr__(self, name, value):
+        # Importar o submódulo (ex: from config.settings import ...) faz o
+        # import system definir config.settings como o módulo; o pacote
+        # exporta o objeto Settings com esse nome, então a atribuição é ignorada
+        if name == "settings" and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        # Só o nome pedido: settings e MUNICIPIOS_PIAUI também são lazy no submódulo
+        value = getattr(import_module(".settings", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+sys.modules[__name__].__class__ = _ConfigModule
@@ -13,31 +13,47 @@ import argparse
 import sys
 from pathlib import Path
 
-from loguru import logger
+# O diretório deste script já é sys.path[0] ao executar "python main.py",
+# então config/ e src/ são importáveis sem alterar o path.
 
-# Adicionar diretório raiz ao path
-sys.path.insert(0, str(Path(__file__).parent))
+# loguru e config.settings são importados dentro de cada comando: o "info"
+# (padrão) não precisa configurar logging
 
-from config.settings import settings
 
+def setup_logging(level: str = "INFO", persistent: bool = False) -> None:
+    """
+    Configura logging.
+
+    Args:
+        level: Nível de log no terminal
+        persistent: Gravar também em logs/pipeline_{time}.log (nível DEBUG)
+    """
+    from loguru import logger
 
-def setup_logging(level: str = "INFO") -> None:
-    """Configura logging."""
     logger.remove()
     logger.add(
         sys.stderr,
         format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{message}</cyan>",
         level=level
     )
-    logger.add(
-        "logs/pipeline_{time}.log",
-        rotation="10 MB",
-        level="DEBUG"
-    )
-
-
-def generate_data() -> None:
-    """Gera dados sintéticos multissetoriais."""
+    if persistent:
+        logger.add(
+            "logs/pipeline_{time}.log",
+            rotation="10 MB",
+            level="DEBUG"
+        )
+
+
+def generate_data(fmt: str = "parquet") -> None:
+    """
+    Gera dados sintéticos multissetoriais.
+
+    Args:
+        fmt: Formato dos arquivos: "parquet" (zstd) ou "csv" (utf-8-sig, para Excel)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from loguru import logger
+    from config.settings import settings
     from src.extractors import SyntheticDataGenerator
     import pandas as pd
 
@@ -50,10 +66,19 @@ def generate_data() -> None:
     output_dir = Path(settings.data_dir) / "processed"
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    for name, df in datasets.items():
-        filepath = output_dir / f"{name}.csv"
-        df.to_csv(filepath, index=False, encoding="utf-8-sig")
-        logger.info(f"Salvo: {filepath} ({len(df)} registros)")
+    def save(item):
+        name, df = item
+        filepath = output_dir / f"{name}.{fmt}"
+        if fmt == "parquet":
+            df.to_parquet(filepath, index=False, compression="zstd")
+        else:
+            df.to_csv(filepath, index=False, encoding="utf-8-sig")
+        return filepath, len(df)
+
+    # Arquivos independentes: gravados em paralelo (o writer do pyarrow libera o GIL)
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(datasets)))) as executor:
+        for filepath, n_rows in executor.map(save, datasets.items()):
+            logger.info(f"Salvo: {filepath} ({n_rows} registros)")
 
     total = sum(len(df) for df in datasets.values())
     print(f"\nDados gerados com sucesso!")
@@ -64,6 +89,8 @@ def generate_data() -> None:
 def start_api() -> None:
     """Inicia a API REST."""
     import uvicorn
+    from loguru import logger
+    from config.settings import settings
     from src.api import app
 
     logger.info("Iniciando API REST...")
@@ -79,18 +106,25 @@ def start_api() -> None:
     )
 
 
-def run_pipeline() -> None:
-    """Executa pipeline ETL completo."""
+def run_pipeline(fmt: str = "parquet") -> None:
+    """
+    Executa pipeline ETL completo.
+
+    Args:
+        fmt: Formato dos arquivos gerados ("parquet" ou "csv")
+    """
+    from loguru import logger
+
     logger.info("Executando pipeline ETL...")
 
     # 1. Gerar/Extrair dados
-    generate_data()
+    generate_data(fmt)
 
     # 2. Transformar (já feito no generator)
     logger.info("Transformações aplicadas durante a geração")
 
-    # 3. Carregar (dados já salvos em CSV)
-    logger.info("Dados carregados em arquivos CSV")
+    # 3. Carregar (dados já salvos em arquivos)
+    logger.info(f"Dados carregados em arquivos {fmt.upper()}")
 
     print("\nPipeline ETL concluído!")
     print("Para consultar os dados, inicie a API: python main.py api")
@@ -98,7 +132,7 @@ def run_pipeline() -> None:
 
 def show_info() -> None:
     """Exibe informações do sistema."""
-    from config.settings import FONTES_DADOS, MUNICIPIOS_PIAUI
+    from config.settings import settings, FONTES_DADOS, MUNICIPIOS_PIAUI
 
     print("\n" + "=" * 60)
     print("SISTEMA DE INTEGRAÇÃO MULTISSETORIAL - PIAUÍ")
@@ -130,7 +164,8 @@ def main():
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Exemplos:
-  python main.py generate     # Gerar dados sintéticos
+  python main.py generate     # Gerar dados sintéticos (Parquet)
+  python main.py generate --format csv  # Gerar em CSV (utf-8-sig)
   python main.py api          # Iniciar API REST na porta 8000
   python main.py pipeline     # Executar pipeline completo
   python main.py info         # Informações do sistema
@@ -146,17 +181,26 @@ Exemplos:
     )
 
     parser.add_argument("--log-level", default="INFO", help="Nível de log")
+    parser.add_argument(
+        "--format",
+        choices=["parquet", "csv"],
+        default="parquet",
+        help="Formato dos dados gerados (generate/pipeline)"
+    )
 
     args = parser.parse_args()
 
-    setup_logging(args.log_level)
+    # O "info" só imprime na tela; não há o que registrar em log. Arquivo de
+    # log apenas para generate/pipeline (a API já tem o log do uvicorn)
+    if args.command != "info":
+        setup_logging(args.log_level, persistent=args.command in {"generate", "pipeline"})
 
     if args.command == "generate":
-        generate_data()
+        generate_data(args.format)
     elif args.command == "api":
         start_api()
     elif args.command == "pipeline":
-        run_pipeline()
+        run_pipeline(args.format)
     else:
         show_info()
 
@@ -8,7 +8,8 @@ Dados reais tem prioridade quando disponiveis.
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
+from collections import OrderedDict
 from loguru import logger
 from dataclasses import dataclass
 
@@ -35,6 +36,9 @@ class DataLoader:
     - Assistencia Social (MDS - simulados)
     """
 
+    # Matrizes de correlacao mantidas em memoria (combinacoes de indicadores)
+    CORR_CACHE_SIZE = 32
+
     def __init__(self, base_path: Path = None):
         self.base_path = base_path or Path(__file__).parent.parent.parent
         self.real_data_path = self.base_path / "data" / "real"
@@ -43,7 +47,11 @@ class DataLoader:
 
         self._cache: Dict[str, pd.DataFrame] = {}
         self._sources: Dict[str, DataSource] = {}
+        self._row_index: Dict[str, Dict[int, np.ndarray]] = {}
         self._integrated_cache: Optional[pd.DataFrame] = None
+        self._integrated_pib_cache: Optional[pd.DataFrame] = None
+        self._corr_cache: "OrderedDict[Tuple[str, ...], pd.DataFrame]" = OrderedDict()
+        self._mesorregioes_cache: Optional[pd.DataFrame] = None
 
         logger.info(f"DataLoader inicializado | base_path={self.base_path}")
 
@@ -162,6 +170,11 @@ class DataLoader:
             if df is not None:
                 multi_data['integrado'] = df
                 self._integrated_cache = df
+                # Derivados do dataset anterior deixam de valer
+                self._integrated_pib_cache = None
+                self._corr_cache.clear()
+                self._mesorregioes_cache = None
+                self._row_index.pop('integrado', None)
                 self._sources['integrado'] = DataSource(
                     name="Dados Integrados Multissetoriais",
                     is_real=False,
@@ -225,6 +238,11 @@ class DataLoader:
 
         # 4. Combinar (reais sobrescrevem sinteticos)
         self._cache = {**synthetic_data, **multi_data, **real_data}
+        # Indices e derivados calculados sobre o cache anterior deixam de valer
+        self._row_index.clear()
+        self._integrated_pib_cache = None
+        self._corr_cache.clear()
+        self._mesorregioes_cache = None
 
         # Log resumo
         logger.info("=" * 50)
@@ -250,84 +268,101 @@ class DataLoader:
             for name, source in self._sources.items()
         }
 
+    def _municipio_rows(self, name: str, df: pd.DataFrame) -> Dict[int, np.ndarray]:
+        """
+        Posicoes das linhas de cada municipio no dataset (calculado uma vez).
+
+        Args:
+            name: Nome do dataset em cache
+            df: DataFrame do dataset
+
+        Returns:
+            Dicionario municipio_id -> array de posicoes (em ordem crescente)
+        """
+        rows = self._row_index.get(name)
+        if rows is None:
+            rows = df.groupby('municipio_id', sort=False).indices
+            self._row_index[name] = rows
+        return rows
+
+    def _filter(self, name: str, df: pd.DataFrame, municipio_id: int = None, ano: int = None) -> pd.DataFrame:
+        """
+        Filtra um dataset em cache por municipio e/ou ano.
+
+        O municipio e localizado pelo indice de linhas (dict, sem varrer a
+        coluna); o ano e filtrado apenas nessas linhas. Sem filtros, retorna
+        o proprio frame em cache (somente leitura): os metodos get_* nao
+        copiam os dados, entao quem precisar alterar o resultado deve chamar
+        .copy().
+
+        Args:
+            name: Nome do dataset em cache (chave do indice de linhas)
+            df: DataFrame do dataset
+            municipio_id: Codigo IBGE do municipio (None = todos)
+            ano: Ano (None = todos)
+
+        Returns:
+            DataFrame filtrado
+        """
+        if not municipio_id and not ano:
+            return df
+
+        if municipio_id:
+            rows = self._municipio_rows(name, df).get(municipio_id, np.empty(0, dtype=np.intp))
+            if ano:
+                rows = rows[df['ano'].to_numpy()[rows] == ano]
+        else:
+            rows = np.flatnonzero(df['ano'].to_numpy() == ano)
+        return df.iloc[rows]
+
     def get_pib_data(self, municipio_id: int = None, ano: int = None) -> pd.DataFrame:
         """Retorna dados de PIB, priorizando dados reais."""
         if 'economia_pib' not in self._cache:
             return pd.DataFrame()
 
-        df = self._cache['economia_pib'].copy()
-
-        if municipio_id:
-            df = df[df['municipio_id'] == municipio_id]
-        if ano:
-            df = df[df['ano'] == ano]
-
-        return df
+        return self._filter('economia_pib', self._cache['economia_pib'], municipio_id, ano)
 
     def get_populacao_data(self, municipio_id: int = None, ano: int = None) -> pd.DataFrame:
         """Retorna dados de populacao."""
         if 'populacao' not in self._cache:
             if 'economia_pib' in self._cache and 'populacao_estimada' in self._cache['economia_pib'].columns:
-                df = self._cache['economia_pib'][['municipio_id', 'municipio_nome', 'ano', 'populacao_estimada']].copy()
+                # Mesmas linhas do economia_pib: reaproveita o indice dele
+                name = 'economia_pib'
+                df = self._cache[name][['municipio_id', 'municipio_nome', 'ano', 'populacao_estimada']]
             else:
                 return pd.DataFrame()
         else:
-            df = self._cache['populacao'].copy()
-
-        if municipio_id:
-            df = df[df['municipio_id'] == municipio_id]
-        if ano:
-            df = df[df['ano'] == ano]
+            name = 'populacao'
+            df = self._cache[name]
 
-        return df
+        return self._filter(name, df, municipio_id, ano)
 
     def get_saude_data(self, municipio_id: int = None, ano: int = None) -> pd.DataFrame:
         """Retorna dados de saude."""
         if 'saude' not in self._cache:
             return pd.DataFrame()
 
-        df = self._cache['saude'].copy()
-
-        if municipio_id:
-            df = df[df['municipio_id'] == municipio_id]
-        if ano:
-            df = df[df['ano'] == ano]
-
-        return df
+        return self._filter('saude', self._cache['saude'], municipio_id, ano)
 
     def get_educacao_data(self, municipio_id: int = None, ano: int = None) -> pd.DataFrame:
         """Retorna dados de educacao."""
         if 'educacao' not in self._cache:
             return pd.DataFrame()
 
-        df = self._cache['educacao'].copy()
-
-        if municipio_id:
-            df = df[df['municipio_id'] == municipio_id]
-        if ano:
-            df = df[df['ano'] == ano]
-
-        return df
+        return self._filter('educacao', self._cache['educacao'], municipio_id, ano)
 
     def get_assistencia_data(self, municipio_id: int = None, ano: int = None) -> pd.DataFrame:
         """Retorna dados de assistencia social."""
         if 'assistencia' not in self._cache:
             return pd.DataFrame()
 
-        df = self._cache['assistencia'].copy()
-
-        if municipio_id:
-            df = df[df['municipio_id'] == municipio_id]
-        if ano:
-            df = df[df['ano'] == ano]
-
-        return df
+        return self._filter('assistencia', self._cache['assistencia'], municipio_id, ano)
 
     def get_integrated_data(self) -> pd.DataFrame:
-        """Retorna dataset integrado com todos os indicadores."""
+        """Retorna dataset integrado com todos os indicadores (somente leitura)."""
         if 'integrado' not in self._cache:
             return pd.DataFrame()
-        return self._cache['integrado'].copy()
+        return self._cache['integrado']
 
     def get_municipio_completo(self, municipio_id: int) -> dict:
         """
@@ -367,7 +402,7 @@ class DataLoader:
         # Integrado (snapshot 2021)
         df_int = self.get_integrated_data()
         if not df_int.empty:
-            mun_data = df_int[df_int['municipio_id'] == municipio_id]
+            mun_data = self._filter('integrado', df_int, municipio_id)
             if not mun_data.empty:
                 result["perfil_integrado"] = mun_data.iloc[0].to_dict()
 
@@ -383,8 +418,7 @@ class DataLoader:
         Returns:
             DataFrame com matriz de correlacao
         """
-        df = self.get_integrated_data()
-        if df.empty:
+        if self.get_integrated_data().empty:
             return pd.DataFrame()
 
         if indicadores is None:
@@ -394,23 +428,41 @@ class DataLoader:
                 'ideb_anos_iniciais', 'ideb_anos_finais',
                 'taxa_pobreza_estimada'
             ]
+        else:
+            indicadores = list(indicadores)
 
         # Adicionar PIB se disponivel
-        if 'economia_pib' in self._cache:
-            df_pib = self._cache['economia_pib']
-            df_pib_2021 = df_pib[df_pib['ano'] == 2021][['municipio_id', 'pib_per_capita']].copy()
-            if 'pib_per_capita' in df_pib_2021.columns:
-                df = df.merge(df_pib_2021, on='municipio_id', how='left')
-                if 'pib_per_capita' not in indicadores:
-                    indicadores.append('pib_per_capita')
+        if 'economia_pib' in self._cache and 'pib_per_capita' not in indicadores:
+            indicadores.append('pib_per_capita')
 
         # Filtrar colunas disponiveis
-        cols_disponiveis = [c for c in indicadores if c in df.columns]
+        df = self._integrated_with_pib()
+        cols_disponiveis = tuple(c for c in indicadores if c in df.columns)
 
         if len(cols_disponiveis) < 2:
             return pd.DataFrame()
 
-        return df[cols_disponiveis].corr()
+        # Os dados nao mudam apos o carregamento: a matriz depende so das colunas
+        corr = self._corr_cache.get(cols_disponiveis)
+        if corr is None:
+            corr = df[list(cols_disponiveis)].corr()
+            self._corr_cache[cols_disponiveis] = corr
+            if len(self._corr_cache) > self.CORR_CACHE_SIZE:
+                self._corr_cache.popitem(last=False)
+        else:
+            self._corr_cache.move_to_end(cols_disponiveis)
+        return corr
+
+    def _integrated_with_pib(self) -> pd.DataFrame:
+        """Dataset integrado com o PIB per capita de 2021 (merge feito uma vez)."""
+        if self._integrated_pib_cache is None:
+            df = self.get_integrated_data()
+            if 'economia_pib' in self._cache:
+                df_pib = self._cache['economia_pib']
+                df_pib_2021 = df_pib[df_pib['ano'] == 2021][['municipio_id', 'pib_per_capita']]
+                df = df.merge(df_pib_2021, on='municipio_id', how='left')
+            self._integrated_pib_cache = df
+        return self._integrated_pib_cache
 
     def get_municipios_prioritarios(
         self,
@@ -436,14 +488,15 @@ class DataLoader:
             df_sorted = df.sort_values('indice_vulnerabilidade', ascending=False)
         elif criterio == "saude":
             # Alta mortalidade infantil + baixa cobertura vacinal
-            df['prioridade_saude'] = (
+            # assign: o frame integrado em cache nao e alterado
+            df = df.assign(prioridade_saude=(
                 df['mortalidade_infantil'] / df['mortalidade_infantil'].max() +
                 (1 - df['cobertura_vacinal'] / 100)
-            ) / 2
+            ) / 2)
             df_sorted = df.sort_values('prioridade_saude', ascending=False)
         elif criterio == "educacao":
             # Baixo IDEB
-            df['prioridade_educacao'] = 1 - (df['ideb_anos_iniciais'] / 10)
+            df = df.assign(prioridade_educacao=1 - (df['ideb_anos_iniciais'] / 10))
             df_sorted = df.sort_values('prioridade_educacao', ascending=False)
         elif criterio == "economia":
             # Alta taxa de pobreza
@@ -457,9 +510,14 @@ class DataLoader:
         """
         Calcula medias dos indicadores por mesorregiao.
 
+        O agregado e calculado uma vez e reutilizado (somente leitura).
+
         Returns:
             DataFrame com comparativo entre mesorregioes
         """
+        if self._mesorregioes_cache is not None:
+            return self._mesorregioes_cache
+
         df = self.get_integrated_data()
         if df.empty:
             return pd.DataFrame()
@@ -472,7 +530,10 @@ class DataLoader:
 
         cols_disponiveis = [c for c in indicadores_numericos if c in df.columns]
 
-        return df.groupby('mesorregiao')[cols_disponiveis].mean().round(2)
+        self._mesorregioes_cache = (
+            df.groupby('mesorregiao')[cols_disponiveis].mean().round(2)
+        )
+        return self._mesorregioes_cache
 
     def is_real_data(self, dataset_name: str) -> bool:
         """Verifica se o dataset contem dados reais."""